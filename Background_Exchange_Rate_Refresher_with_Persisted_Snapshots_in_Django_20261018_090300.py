@@ -0,0 +1,113 @@
+Title: Background Exchange Rate Refresher with Persisted Snapshots in Django
+
+```python
+# models.py
+import struct
+
+from django.db import models, transaction
+from django.utils import timezone
+
+
+class RateSnapshot(models.Model):
+    """
+    Latest exchange-rate table for one base currency, stored compactly.
+
+    One row per base currency. `rates` is a packed little-endian float64 array
+    whose order matches the comma-separated `codes`.
+    """
+    base = models.CharField(max_length=3, unique=True)
+    codes = models.TextField()
+    rates = models.BinaryField()
+    version = models.PositiveIntegerField(default=1)
+    fetched_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"RateSnapshot({self.base} v{self.version} at {self.fetched_at})"
+
+    def as_dict(self):
+        """Unpack the stored table into a {currency: rate} dict."""
+        codes = self.codes.split(',')
+        return dict(zip(codes, struct.unpack(f'<{len(codes)}d', self.rates)))
+
+    @classmethod
+    def store(cls, base, rates, fetched_at=None):
+        """Replace the snapshot for `base` with `rates`, bumping its version."""
+        rates = dict(rates)
+        rates.setdefault(base, 1.0)
+        codes = sorted(rates)
+        fields = {
+            'codes': ','.join(codes),
+            'rates': struct.pack(f'<{len(codes)}d', *(rates[code] for code in codes)),
+            'fetched_at': fetched_at or timezone.now(),
+        }
+
+        with transaction.atomic():
+            snapshot, created = cls.objects.select_for_update().get_or_create(base=base, defaults=fields)
+            if not created:
+                for name, value in fields.items():
+                    setattr(snapshot, name, value)
+                snapshot.version += 1
+                snapshot.save()
+        return snapshot
+
+
+# management/commands/refresh_rates.py
+import time
+from datetime import datetime, timezone as dt_timezone
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from ...history import rate_history
+from ...rates import rate_provider
+
+
+class Command(BaseCommand):
+    help = 'Fetches exchange rates from the upstream API and stores them as the latest RateSnapshot.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running and refresh every N seconds. By default refresh once and exit.',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Entry point for the Django management command.
+        With --interval it runs as a long-lived worker; a failed fetch is reported
+        and retried on the next tick while views keep serving the previous snapshot.
+        """
+        interval = options['interval']
+        while True:
+            try:
+                table = rate_provider.refresh()
+                # Keep every snapshot for point-in-time conversions
+                rate_history.append(
+                    table.rates_for(table.base), datetime.fromtimestamp(table.fetched_at, dt_timezone.utc)
+                )
+                self.stdout.write(
+                    f"Stored {table.base} rate snapshot v{table.version} ({len(table.codes)} currencies)"
+                )
+            except requests.exceptions.RequestException as e:
+                if not interval:
+                    raise CommandError(f"Rate refresh failed: {e}")
+                self.stderr.write(f"Rate refresh failed: {e}")
+
+            if not interval:
+                break
+            time.sleep(interval)
+
+
+# Run migrations to create the RateSnapshot model, then seed the first snapshot:
+# $ python manage.py makemigrations
+# $ python manage.py migrate
+# $ python manage.py refresh_rates
+#
+# Keep rates fresh with a long-running worker (e.g. under systemd or supervisor):
+# $ python manage.py refresh_rates --interval 300
+#
+# or from cron:
+# */5 * * * * /path/to/venv/bin/python /path/to/manage.py refresh_rates
+```
+
+This moves exchange-rate fetching off the request path. The `refresh_rates` command calls `rate_provider.refresh()` once, or every `--interval` seconds when run as a worker. Each fetch is stored as a `RateSnapshot` row: one row per base currency, with the rates packed as a float64 blob and a `version` that increases on every refresh. The conversion views read only the latest snapshot through `rate_provider`, so they never do network I/O. A freshly started worker warms from the last persisted snapshot, and a failed fetch leaves the previous snapshot in service. Every stored snapshot is also appended to `rate_history` for point-in-time conversions.
@@ -0,0 +1,226 @@
+Title: Content-Addressed QR Code Image Cache in Django
+
+```python
+# Install required packages:
+# pip install django qrcode[pil] pillow numpy
+
+# qr_cache.py
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import qrcode
+import qrcode.image.svg
+import qrcode.util
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from qrcode.exceptions import DataOverflowError
+
+from .qr_render import render_png, render_svg
+
+ERROR_CORRECTION = {
+    'L': qrcode.constants.ERROR_CORRECT_L,
+    'M': qrcode.constants.ERROR_CORRECT_M,
+    'Q': qrcode.constants.ERROR_CORRECT_Q,
+    'H': qrcode.constants.ERROR_CORRECT_H,
+}
+CONTENT_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml'}
+RENDERERS = ('native', 'pil')
+
+
+def qr_options(params, defaults=None):
+    """
+    Read rendering options (version, error_correction, box_size, border, format, renderer)
+    from a query dict or JSON object. Raises ValueError for values the renderer cannot use.
+    """
+    options = dict(defaults or {
+        'version': 1, 'error_correction': 'L', 'box_size': 10, 'border': 4, 'fmt': 'png', 'renderer': None,
+    })
+    if params.get('version') not in (None, ''):
+        options['version'] = None if params['version'] == 'auto' else int(params['version'])
+    if params.get('error_correction'):
+        options['error_correction'] = str(params['error_correction']).upper()
+    if params.get('box_size') not in (None, ''):
+        options['box_size'] = int(params['box_size'])
+    if params.get('border') not in (None, ''):
+        options['border'] = int(params['border'])
+    if params.get('format'):
+        options['fmt'] = str(params['format']).lower()
+    if params.get('renderer'):
+        options['renderer'] = str(params['renderer']).lower()
+
+    if options['version'] is not None and not 1 <= options['version'] <= 40:
+        raise ValueError('version must be 1-40 or auto')
+    if options['error_correction'] not in ERROR_CORRECTION:
+        raise ValueError('error_correction must be one of L, M, Q, H')
+    if not 1 <= options['box_size'] <= 50 or not 0 <= options['border'] <= 20:
+        raise ValueError('box_size must be 1-50 and border 0-20')
+    if options['fmt'] not in CONTENT_TYPES:
+        raise ValueError('format must be png or svg')
+    if options['renderer'] not in (None, *RENDERERS):
+        raise ValueError('renderer must be native or pil')
+    return options
+
+
+def check_capacity(data, error_correction='L'):
+    """
+    Raise ValueError when `data` does not fit a version 40 QR code, which `render_qr`
+    would otherwise only find out while rendering.
+    """
+    level = ERROR_CORRECTION[error_correction]
+    # Byte mode is the widest encoding, so short payloads need no trial encoding
+    if len(data.encode('utf-8')) * 8 + 20 <= qrcode.util.BIT_LIMIT_TABLE[level][40]:
+        return
+    qr = qrcode.QRCode(error_correction=level)
+    qr.add_data(data)
+    try:
+        qr.best_fit()
+    except (DataOverflowError, ValueError):  # Newer qrcode releases reject version 41 with ValueError
+        raise ValueError(f'data is too long for a QR code at error correction {error_correction}') from None
+
+
+def resolve_renderer(renderer=None):
+    """Return the renderer a render will use: `renderer`, or the QR_RENDERER setting."""
+    return renderer or getattr(settings, 'QR_RENDERER', 'native')
+
+
+def qr_digest(data, version=1, error_correction='L', box_size=10, border=4, fmt='png', renderer=None):
+    """
+    SHA-256 over every input that affects the rendered bytes. The renderer is included:
+    'native' and 'pil' draw the same pixels but encode them differently.
+    """
+    key = '\x1f'.join([
+        data, str(version), error_correction, str(box_size), str(border), fmt, resolve_renderer(renderer),
+    ])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def render_qr(data, version=1, error_correction='L', box_size=10, border=4, fmt='png', renderer=None):
+    """
+    Render a QR code to PNG or SVG bytes.
+    `renderer` is 'native' (see `qr_render.py`) or 'pil'; both draw the same pixels,
+    but the encoded bytes differ.
+    """
+    qr = qrcode.QRCode(
+        version=version,
+        error_correction=ERROR_CORRECTION[error_correction],
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    if resolve_renderer(renderer) == 'native':
+        if fmt == 'svg':
+            return render_svg(qr.modules, box_size, border)
+        return render_png(qr.modules, box_size, border)
+
+    buffer = BytesIO()
+    if fmt == 'svg':
+        qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+    else:
+        qr.make_image(fill_color='black', back_color='white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class QRImageCache:
+    """
+    Two-tier cache of rendered QR images keyed by `qr_digest`.
+
+    An in-memory LRU (bounded by total bytes) sits in front of Django storage,
+    which is shared by all workers and survives restarts. Images never change
+    for a given digest, so entries are never invalidated, only evicted.
+    """
+
+    def __init__(self, max_bytes=None, prefix='qr_cache'):
+        self.max_bytes = max_bytes or getattr(settings, 'QR_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+        self.prefix = prefix
+        self.storage = default_storage
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def storage_path(self, digest, fmt):
+        return f'{self.prefix}/{digest[:2]}/{digest}.{fmt}'
+
+    def name_for(self, data, version=1, error_correction='L', box_size=10, border=4, fmt='png', renderer=None):
+        """Return (digest, storage path) for an image without rendering it, e.g. for a FileField name."""
+        digest = qr_digest(data, version, error_correction, box_size, border, fmt, renderer)
+        return digest, self.storage_path(digest, fmt)
+
+    def get(self, digest, fmt):
+        """Return cached image bytes for `digest`, or None if they were never rendered."""
+        with self._lock:
+            body = self._entries.get(digest)
+            if body is not None:
+                self._entries.move_to_end(digest)
+                return body
+
+        path = self.storage_path(digest, fmt)
+        if not self.storage.exists(path):
+            return None
+        with self.storage.open(path, 'rb') as f:
+            body = f.read()
+        self._remember(digest, body)
+        return body
+
+    def get_or_render(self, data, version=1, error_correction='L', box_size=10, border=4, fmt='png', renderer=None):
+        """Return (digest, image bytes), rendering and storing the image only on first use."""
+        digest = qr_digest(data, version, error_correction, box_size, border, fmt, renderer)
+        body = self.get(digest, fmt)
+        if body is None:
+            body = render_qr(data, version, error_correction, box_size, border, fmt, renderer)
+            path = self.storage_path(digest, fmt)
+            if not self.storage.exists(path):
+                saved = self.storage.save(path, ContentFile(body))
+                if saved != path:
+                    # Another worker stored the same image since the check and storage renamed ours
+                    self.storage.delete(saved)
+            self._remember(digest, body)
+        return digest, body
+
+    def _remember(self, digest, body):
+        with self._lock:
+            if digest in self._entries:
+                return
+            self._entries[digest] = body
+            self._size += len(body)
+            while self._size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+def qr_image_response(request, digest, body, fmt='png', immutable=True):
+    """
+    Serve cached image bytes with a strong ETag; answers 304 when the client already has them.
+    Pass `immutable=False` when the URL does not identify the payload (e.g. a database row
+    whose data can be edited): clients then revalidate on every use instead of caching for a year.
+    """
+    etag = f'"{digest}"'
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type=CONTENT_TYPES[fmt])
+    response['ETag'] = etag
+    if immutable:
+        patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+# Shared by every QR view in the process
+qr_image_cache = QRImageCache()
+
+
+# settings.py
+# QR_CACHE_MAX_BYTES = 32 * 1024 * 1024  # In-memory tier; the storage tier is unbounded
+# QR_RENDERER = 'native'  # See qr_render.py
+```
+
+`QRImageCache` stores each rendered QR image under a SHA-256 of everything that affects the output: the data, version, error correction level, box size, border, format and renderer. The renderer counts because `native` and `pil` draw the same pixels but encode different bytes, and a strong `ETag` must always name the same bytes. Identical labels are rendered once. Later requests are served from an in-memory LRU, or from Django storage (`qr_cache/<xx>/<digest>.<fmt>`) after a restart or on another worker. `qr_image_response` returns the bytes with a strong `ETag` and `Cache-Control: immutable`, because a digest always maps to the same image, and it answers revalidations with `304 Not Modified`. The QR generation views in the other modules now go through `qr_image_cache.get_or_render`.
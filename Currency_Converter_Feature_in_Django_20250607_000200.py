@@ -3,15 +3,27 @@ Title: Currency Converter Feature in Django
 ```python
 # views.py
 
+import json
+import math
+
+from django.conf import settings
 from django.http import JsonResponse
+from django.utils.decorators import method_decorator
 from django.views import View
-import requests
+from django.views.decorators.csrf import csrf_exempt
+from .history import rate_history, parse_at
+from .rates import rate_provider, RatesUnavailable
+
+class InvalidLine(dict):
+    """`{'error': ...}` placeholder for an NDJSON line that could not be parsed."""
+
 
 class CurrencyConverterView(View):
     def get(self, request):
         """
         Handles GET requests for currency conversion.
-        Expects 'amount', 'from_currency', 'to_currency' as query parameters.
+        Expects 'amount', 'from_currency', 'to_currency' as query parameters,
+        plus an optional 'at' (ISO date or datetime) to convert at a historical rate.
         """
         # Parse query parameters
         amount = request.GET.get('amount', None)
@@ -23,54 +35,168 @@ class CurrencyConverterView(View):
             return JsonResponse({'error': 'Missing required parameters'}, status=400)
 
         try:
-            # Convert amount to float
+            # Convert amount to float; NaN and infinity would be written out as invalid JSON
             amount = float(amount)
+            if not math.isfinite(amount):
+                raise ValueError(amount)
         except ValueError:
             return JsonResponse({'error': 'Invalid amount format'}, status=400)
 
-        # Obtain currency conversion rate via an external API
-        try:
-            response = requests.get(
-                f'https://api.exchangerate-api.com/v4/latest/{from_currency.upper()}'
-            )
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            data = response.json()
+        at = request.GET.get('at')
+        if at:
+            try:
+                at = parse_at(at)
+            except ValueError:
+                return JsonResponse({'error': 'Invalid date format for at'}, status=400)
 
-            # Check if the target currency is available in the response
-            rates = data.get('rates', {})
-            if to_currency.upper() not in rates:
-                return JsonResponse({'error': f"Exchange rate for '{to_currency}' not available"}, status=400)
+        # Look up the pair in the shared cross-rate table (one upstream fetch serves every pair)
+        try:
+            try:
+                if at:
+                    conversion_rate, rates_as_of = rate_history.rate_at(from_currency, to_currency, at)
+                else:
+                    conversion_rate = rate_provider.get_rate(from_currency, to_currency)
+            except KeyError as e:
+                return JsonResponse({'error': f"Exchange rate for '{e.args[0]}' not available"}, status=400)
 
             # Compute the converted amount
-            conversion_rate = rates[to_currency.upper()]
             converted_amount = amount * conversion_rate
 
-            return JsonResponse({
+            data = {
                 'from_currency': from_currency.upper(),
                 'to_currency': to_currency.upper(),
                 'amount': amount,
                 'converted_amount': converted_amount,
                 'conversion_rate': conversion_rate
-            })
+            }
+            if at:
+                data['rates_as_of'] = rates_as_of.isoformat()
+            return JsonResponse(data)
+
+        except RatesUnavailable as e:
+            # No snapshot has been stored by the refresh_rates command yet
+            return JsonResponse({'error': 'Exchange rates unavailable', 'details': str(e)}, status=503)
 
-        except requests.exceptions.RequestException as e:
-            # Handle any errors from the external API
-            return JsonResponse({'error': 'External API request failed', 'details': str(e)}, status=500)
+
+@method_decorator(csrf_exempt, name='dispatch')
+class CurrencyBatchConvertView(View):
+    """
+    Converts many (amount, from_currency, to_currency) items in one request.
+
+    The body is either a JSON array or, with an NDJSON content type such as
+    `application/x-ndjson`, one item per line. Each item is
+    `[amount, from_currency, to_currency]` or an object with those keys. An optional
+    `?at=` query parameter converts the whole batch at a historical rate.
+    """
+
+    def post(self, request):
+        max_items = getattr(settings, 'CURRENCY_BATCH_MAX_ITEMS', 100_000)
+        max_bytes = getattr(settings, 'CURRENCY_BATCH_MAX_BYTES', 16 * 1024 * 1024)
+
+        # Read the body directly: batches are expected to exceed DATA_UPLOAD_MAX_MEMORY_SIZE
+        body = request.read(max_bytes + 1)
+        if len(body) > max_bytes:
+            return JsonResponse({'error': f'Batch exceeds {max_bytes} bytes'}, status=413)
+
+        try:
+            items = self.parse_items(body, request.content_type)
+        except ValueError:
+            return JsonResponse({'error': 'Body must be a JSON array or NDJSON'}, status=400)
+        if len(items) > max_items:
+            return JsonResponse({'error': f'Batch exceeds {max_items} items'}, status=400)
+
+        # Validate every item up front; invalid ones get an error slot but do not fail the batch
+        amounts, from_codes, to_codes, errors = [], [], [], {}
+        for position, item in enumerate(items):
+            error = None
+            if isinstance(item, InvalidLine):
+                error = item['error']
+            else:
+                try:
+                    if isinstance(item, dict):
+                        amount, from_currency, to_currency = item['amount'], item['from_currency'], item['to_currency']
+                    else:
+                        amount, from_currency, to_currency = item
+                    amount = float(amount)
+                    from_currency, to_currency = from_currency.upper(), to_currency.upper()
+                except (KeyError, TypeError, ValueError, AttributeError):
+                    error = 'Expected amount, from_currency and to_currency'
+                else:
+                    if not math.isfinite(amount):
+                        error = 'Amount must be a finite number'  # NaN or infinity would make the response invalid JSON
+            if error:
+                errors[position] = error
+                amount, from_currency, to_currency = 0.0, '', ''
+            amounts.append(amount)
+            from_codes.append(from_currency)
+            to_codes.append(to_currency)
+
+        try:
+            at = request.GET.get('at')
+            table = rate_history.table_at(parse_at(at)) if at else rate_provider.get_table()
+        except ValueError:
+            return JsonResponse({'error': 'Invalid date format for at'}, status=400)
+        except RatesUnavailable as e:
+            return JsonResponse({'error': 'Exchange rates unavailable', 'details': str(e)}, status=503)
+
+        # One vectorized pass over the cross-rate matrix for the whole batch
+        converted, rates, valid = table.convert_many(amounts, from_codes, to_codes)
+
+        # Items that failed validation carry empty codes, so they are never valid here
+        results = []
+        for position, (ok, converted_amount, conversion_rate) in enumerate(
+            zip(valid.tolist(), converted.tolist(), rates.tolist())
+        ):
+            if ok and not math.isfinite(converted_amount):
+                results.append({'error': 'Converted amount is out of range'})
+            elif ok:
+                results.append({'converted_amount': converted_amount, 'conversion_rate': conversion_rate})
+            elif position in errors:
+                results.append({'error': errors[position]})
+            else:
+                missing = from_codes[position] if from_codes[position] not in table.index else to_codes[position]
+                results.append({'error': f"Exchange rate for '{missing}' not available"})
+
+        return JsonResponse({'results': results, 'error_count': sum('error' in result for result in results)})
+
+    @staticmethod
+    def parse_items(body, content_type):
+        """
+        Decode an NDJSON (by content type) or JSON array body into a list of items.
+        An NDJSON line that is not valid JSON becomes an `InvalidLine` in its place.
+        """
+        if content_type in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+            items = []
+            for number, line in enumerate(body.splitlines(), start=1):
+                if not line.strip():
+                    continue
+                try:
+                    items.append(json.loads(line))
+                except ValueError:
+                    items.append(InvalidLine(error=f'Line {number} is not valid JSON'))
+            return items
+        items = json.loads(body)
+        if not isinstance(items, list):
+            raise ValueError('Expected a JSON array')
+        return items
 
 
 # urls.py
 
 from django.urls import path
-from .views import CurrencyConverterView
+from .views import CurrencyConverterView, CurrencyBatchConvertView
 
 urlpatterns = [
     path('convert-currency/', CurrencyConverterView.as_view(), name='convert_currency'),
+    path('convert-currency/batch/', CurrencyBatchConvertView.as_view(), name='convert_currency_batch'),
 ]
 ```
 
 Here are the steps taken:
 - The code defines a `CurrencyConverterView` class-based view in Django.
-- The `get` method validates input parameters and makes a request to an external currency exchange rate API.
+- The `get` method validates input parameters and looks up the pair in the shared `rate_provider` cross-rate table. That table is built from the latest stored rate snapshot, so the request never calls the external exchange rate API.
+- An optional `at` parameter converts at the rate recorded at that date or time, looked up in `rate_history`.
 - It checks for possible errors and edge cases such as missing parameters, invalid amount format, and unavailable currency codes.
 - Error handling is done gracefully with detailed JSON error responses.
-- The URL configuration maps the `/convert-currency/` endpoint to the `CurrencyConverterView`.
\ No newline at end of file
+- `CurrencyBatchConvertView` accepts a JSON array or NDJSON of `(amount, from_currency, to_currency)` items and converts them all in one vectorized pass over the cross-rate matrix. Results come back in input order, and an invalid item gets its own `error` entry without failing the batch. This covers an NDJSON line that is not valid JSON and an amount that is NaN or infinite, which JSON cannot represent.
+- The URL configuration maps the `/convert-currency/` endpoint to the `CurrencyConverterView` and `/convert-currency/batch/` to the `CurrencyBatchConvertView`.
\ No newline at end of file
@@ -0,0 +1,205 @@
+Title: Currency Converter Load Benchmark with a Local Stub Rate Server
+
+```python
+# management/commands/bench_converters.py
+import json
+import platform
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlsplit
+
+import django
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from ...rates import RateTable, rate_provider
+from ...stub_server import run_stub_server
+
+# name=METHOD:/path/?params for each converter implementation; adjust paths to your urls.py
+DEFAULT_TARGETS = [
+    'feature_view=GET:/convert-currency/?amount=125.50&from_currency=EUR&to_currency=GBP',
+    'function_view=GET:/convert/?amount=125.50&from_currency=EUR&to_currency=GBP',
+    'mvc_view=POST:/mvc/convert/?amount=125.50&from_currency=EUR&to_currency=GBP',
+]
+
+
+def parse_target(spec):
+    """Split 'name=METHOD:/path/?query' into (name, method, path, params)."""
+    try:
+        name, rest = spec.split('=', 1)
+        method, url = rest.split(':', 1)
+    except ValueError:
+        raise CommandError(f"Invalid target '{spec}'; expected name=METHOD:/path/?query")
+    url = urlsplit(url)
+    return name, method.upper(), url.path, dict(parse_qsl(url.query))
+
+
+def summarize(latencies, errors, elapsed):
+    """Requests/sec and latency percentiles (milliseconds) for one run."""
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(p50 * 1000, 3),
+        'p95_ms': round(p95 * 1000, 3),
+        'p99_ms': round(p99 * 1000, 3),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Load-tests the currency converter views against a local stub rate server and emits JSON results.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--latency', type=float, default=20.0, help='Injected stub latency in ms.')
+        parser.add_argument('--jitter', type=float, default=0.0, help='Extra random stub latency in ms.')
+        parser.add_argument('--concurrency', default='1,4,16,64', help='Comma-separated concurrency levels.')
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per target, mode and level.')
+        parser.add_argument('--modes', default='cached,uncached', help='cached, uncached or both.')
+        parser.add_argument('--target', action='append', dest='targets', help='name=METHOD:/path/?query (repeatable).')
+        parser.add_argument('--base-url', help='Benchmark a running server over HTTP instead of in-process.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        """
+        Entry point for the Django management command.
+        Every run uses a fresh stub server, so results are comparable between releases.
+        """
+        targets = [parse_target(spec) for spec in options['targets'] or DEFAULT_TARGETS]
+        levels = [int(level) for level in options['concurrency'].split(',')]
+        modes = [mode.strip() for mode in options['modes'].split(',')]
+        if set(modes) - {'cached', 'uncached'}:
+            raise CommandError('--modes accepts cached and uncached')
+        if options['base_url'] and modes != ['cached']:
+            raise CommandError('--base-url measures the server as deployed; use --modes cached')
+
+        report = {
+            'meta': {
+                'started_at': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'latency_ms': options['latency'],
+                'jitter_ms': options['jitter'],
+                'requests_per_run': options['requests'],
+                'base_url': options['base_url'],
+            },
+            'results': [],
+        }
+
+        if not options['base_url']:
+            setup_test_environment()  # Lets the test client through ALLOWED_HOSTS
+        api_url, ttl = rate_provider.api_url, rate_provider.ttl
+        try:
+            with run_stub_server(options['latency'] / 1000, options['jitter'] / 1000) as stub:
+                rate_provider.api_url = f'{stub.url}/v4/latest/{{base}}'
+                for mode in modes:
+                    self.prepare(mode)
+                    stub.requests = 0
+                    for name, method, path, params in targets:
+                        for level in levels:
+                            result = self.run(options['base_url'], method, path, params, level, options['requests'])
+                            result.update(target=name, mode=mode, concurrency=level, upstream_requests=stub.requests)
+                            stub.requests = 0
+                            report['results'].append(result)
+                            self.stderr.write(
+                                f"{name:<14} {mode:<8} c={level:<4} {result['rps']:>10} req/s  "
+                                f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms"
+                            )
+        finally:
+            rate_provider.__dict__.pop('get_table', None)
+            rate_provider.api_url, rate_provider.ttl = api_url, ttl
+            rate_provider.invalidate()
+            if not options['base_url']:
+                teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+
+    def prepare(self, mode):
+        """Point the rate provider at the stub: one fetch total (cached) or one per request (uncached)."""
+        base = rate_provider.base
+        if mode == 'cached':
+            rate_provider.__dict__.pop('get_table', None)
+            rate_provider.ttl = 3600
+            rate_provider.install(RateTable.from_rates(base, rate_provider.fetch(base), time.time()))
+        else:
+            # Reproduces the original behaviour: an upstream round trip for every conversion
+            rate_provider.get_table = lambda: RateTable.from_rates(base, rate_provider.fetch(base), time.time())
+
+    def run(self, base_url, method, path, params, concurrency, total):
+        latencies, errors = [], 0
+        lock = threading.Lock()
+        remaining = iter(range(total))
+        local = threading.local()
+
+        def connect():
+            # One session/client per thread; neither is safe to share between threads
+            if not base_url:
+                local.client = Client()  # Does not enforce CSRF checks
+                return
+            local.session = requests.Session()
+            if method != 'GET':
+                # A real server rejects unsafe methods without a CSRF token: load the page once,
+                # as a browser would, and send its token with every request
+                local.session.get(base_url + path, timeout=30)
+                token = local.session.cookies.get(getattr(settings, 'CSRF_COOKIE_NAME', 'csrftoken'))
+                if token:
+                    local.session.headers.update({'X-CSRFToken': token, 'Referer': base_url + path})
+
+        def send():
+            if base_url:
+                if method == 'GET':
+                    return local.session.get(base_url + path, params=params, timeout=30).status_code
+                return local.session.request(method, base_url + path, data=params, timeout=30).status_code
+            client = local.client
+            if method == 'GET':
+                return client.get(path, params).status_code
+            return client.post(path, params).status_code
+
+        def worker():
+            nonlocal errors
+            connect()  # Outside the timed requests
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                started = time.perf_counter()
+                try:
+                    ok = send() < 400
+                except Exception:
+                    ok = False
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    errors += not ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in range(concurrency):
+                pool.submit(worker)
+        return summarize(latencies, errors, time.perf_counter() - started)
+
+
+# Usage:
+# $ python manage.py bench_converters --latency 50 --concurrency 1,8,32 --output bench_currency.json
+# $ python manage.py bench_converters --target feature_view=GET:/convert-currency/?amount=1&from_currency=USD&to_currency=EUR
+# $ python manage.py bench_converters --base-url http://127.0.0.1:8000 --modes cached
+```
+
+`bench_converters` measures the three currency converter views (`CurrencyConverterView.get`, `currency_converter_view` and the MVC `CurrencyConverterView.post`) against `stub_server.py` with a configurable injected latency. For each target, caching mode and concurrency level it reports requests/sec, p50/p95/p99 latency, error count and the number of upstream calls. The report is written as JSON so results can be compared between releases.
+
+In `cached` mode the rate provider fetches from the stub once and serves every conversion from memory, which is how production runs with `refresh_rates`. `uncached` mode reproduces the original behaviour of one upstream round trip per conversion. By default requests go through Django's test client in-process. `--base-url` instead sends them over HTTP to a running server, and the server's own configuration then decides whether rates are cached. For POST targets such as the MVC view, each thread first loads the page with a GET to get Django's CSRF cookie, then sends the token with every request, so the run measures conversions rather than `403` responses. Adjust the `--target` paths to match where each view is mounted in your `urls.py`.
@@ -2,15 +2,25 @@ Title: Currency Converter using Django
 
 ```python
 from django.shortcuts import render
-from django.http import JsonResponse
-import requests
-from typing import Dict, Any
+from django.http import JsonResponse, StreamingHttpResponse, HttpResponseNotAllowed
+from django.utils.cache import patch_cache_control
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition, require_GET
+import csv
+import io
+import json
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from itertools import islice
+from typing import Dict, Any, Iterator, Optional
+import numpy as np
+from .history import rate_history, parse_at
+from .rates import rate_provider, RatesUnavailable
 
-# Function to fetch current exchange rates.
-def get_exchange_rates(api_key: str) -> Dict[str, Any]:
-    url = f"https://api.exchangerate-api.com/v4/latest/USD?api_key={api_key}"
-    response = requests.get(url)
-    return response.json()
+# Function to fetch exchange rates (the latest stored snapshot, or the rates in effect at `at`).
+def get_exchange_rates(base: str = "USD", at: Optional[datetime] = None) -> Dict[str, Any]:
+    table = rate_history.table_at(at) if at else rate_provider.get_table()
+    return {'base': base, 'rates': table.rates_for(base)}
 
 # Function to convert currency using exchange rates.
 def convert_currency(amount: float, from_currency: str, to_currency: str, rates: Dict[str, Any]) -> float:
@@ -20,8 +30,13 @@ def convert_currency(amount: float, from_currency: str, to_currency: str, rates:
 
 # Django view for the currency converter.
 def currency_converter_view(request) -> JsonResponse:
-    api_key = "your_api_key"  # Replace with your actual API key
-    rates = get_exchange_rates(api_key)
+    try:
+        at: Optional[datetime] = parse_at(request.GET['at']) if request.GET.get('at') else None
+        rates = get_exchange_rates(at=at)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date format for at'}, status=400)
+    except RatesUnavailable as e:
+        return JsonResponse({'error': str(e)}, status=503)
 
     # Get parameters from the request.
     amount: float = float(request.GET.get('amount', 1))
@@ -31,21 +46,160 @@ def currency_converter_view(request) -> JsonResponse:
     # Perform currency conversion.
     converted_amount = convert_currency(amount, from_currency, to_currency, rates)
     
-    # Return the result as JSON.
+    # Return the result as JSON. Compact mode (?compact=1) leaves out the full rates
+    # table; fetch it from rates_table_view instead, which supports conditional GET.
     data = {
         'amount': amount,
         'from_currency': from_currency,
         'to_currency': to_currency,
         'converted_amount': converted_amount,
-        'rates': rates['rates'],
     }
+    if request.GET.get('compact') not in ('1', 'true'):
+        data['rates'] = rates['rates']
     return JsonResponse(data)
 
+# ETag and Last-Modified for the rates table follow the stored snapshot version.
+def rates_table_etag(request) -> Optional[str]:
+    try:
+        table = rate_provider.get_table()
+    except RatesUnavailable:
+        return None
+    return f"{table.base}-{table.version}-{request.GET.get('base', 'USD').upper()}"
+
+def rates_table_last_modified(request) -> Optional[datetime]:
+    try:
+        return datetime.fromtimestamp(rate_provider.get_table().fetched_at, dt_timezone.utc)
+    except RatesUnavailable:
+        return None
+
+# Django view returning the full rates table; clients cache it and revalidate with If-None-Match.
+@require_GET
+@condition(etag_func=rates_table_etag, last_modified_func=rates_table_last_modified)
+def rates_table_view(request) -> JsonResponse:
+    base: str = request.GET.get('base', 'USD').upper()
+    try:
+        table = rate_provider.get_table()
+        rates = table.rates_for(base)
+    except RatesUnavailable as e:
+        return JsonResponse({'error': str(e)}, status=503)
+    except KeyError:
+        return JsonResponse({'error': f"Unknown base currency '{base}'"}, status=400)
+
+    response = JsonResponse({'base': base, 'version': table.version, 'rates': rates})
+    patch_cache_control(response, public=True, max_age=rate_provider.ttl)
+    return response
+
+# Number of ledger rows converted per vectorized pass in the bulk upload.
+BULK_CHUNK_ROWS = 10_000
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+# Convert one chunk of (amount, from, to) rows against a single rate table.
+def convert_chunk(table, amounts, from_codes, to_codes):
+    converted, _, valid = table.convert_many(amounts, from_codes, to_codes)
+    # Rounded like convert_currency
+    return np.round(converted, 2).tolist(), valid.tolist()
+
+# Stream converted CSV rows; the input needs amount, from_currency and to_currency columns.
+def stream_csv_conversion(lines: Iterator[bytes], table) -> Iterator[bytes]:
+    reader = csv.DictReader(line.decode('utf-8') for line in lines)
+    buffer = io.StringIO()
+    writer = None
+    while True:
+        rows = list(islice(reader, BULK_CHUNK_ROWS))
+        if not rows:
+            break
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=reader.fieldnames + ['converted_amount', 'error'], extrasaction='ignore')
+            writer.writeheader()
+
+        amounts, from_codes, to_codes = [], [], []
+        for row in rows:
+            # Parse the whole row before appending, so a partial row cannot misalign the lists
+            try:
+                amount = float(row['amount'])
+                from_currency = row['from_currency'].strip().upper()
+                to_currency = row['to_currency'].strip().upper()
+            except (KeyError, TypeError, ValueError, AttributeError):
+                amount, from_currency, to_currency = 0.0, '', ''
+            amounts.append(amount)
+            from_codes.append(from_currency)
+            to_codes.append(to_currency)
+
+        converted, valid = convert_chunk(table, amounts, from_codes, to_codes)
+        for row, amount, ok in zip(rows, converted, valid):
+            row['converted_amount'] = amount if ok else ''
+            row['error'] = '' if ok else 'Invalid row or unknown currency'
+            writer.writerow(row)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+# Stream converted NDJSON records; each input line is an object with amount, from_currency, to_currency.
+def stream_ndjson_conversion(lines: Iterator[bytes], table) -> Iterator[bytes]:
+    lines = (line for line in lines if line.strip())
+    while True:
+        chunk = list(islice(lines, BULK_CHUNK_ROWS))
+        if not chunk:
+            break
+
+        records, amounts, from_codes, to_codes = [], [], [], []
+        for line in chunk:
+            record = None
+            try:
+                record = json.loads(line)
+                amount = float(record['amount'])
+                from_currency = record['from_currency'].upper()
+                to_currency = record['to_currency'].upper()
+            except (KeyError, TypeError, ValueError, AttributeError):
+                if not isinstance(record, dict):
+                    record = {'input': line.decode('utf-8', 'replace').strip()}
+                amount, from_currency, to_currency = 0.0, '', ''
+            records.append(record)
+            amounts.append(amount)
+            from_codes.append(from_currency)
+            to_codes.append(to_currency)
+
+        converted, valid = convert_chunk(table, amounts, from_codes, to_codes)
+        out = []
+        for record, amount, ok in zip(records, converted, valid):
+            if ok:
+                record['converted_amount'] = amount
+            else:
+                record['error'] = 'Invalid record or unknown currency'
+            out.append(json.dumps(record))
+        yield ('\n'.join(out) + '\n').encode('utf-8')
+
+# Django view that converts an uploaded ledger while it is still being received.
+# Send the file as the raw request body (Content-Type: text/csv or application/x-ndjson),
+# not as a multipart form, so Django does not buffer it before the view runs.
+@csrf_exempt
+def bulk_convert_view(request) -> StreamingHttpResponse:
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    # Pin one rate table for the whole file so every row uses the same snapshot
+    try:
+        at: Optional[datetime] = parse_at(request.GET['at']) if request.GET.get('at') else None
+        table = rate_history.table_at(at) if at else rate_provider.get_table()
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date format for at'}, status=400)
+    except RatesUnavailable as e:
+        return JsonResponse({'error': str(e)}, status=503)
+
+    lines = iter(request.readline, b'')
+    if request.content_type in NDJSON_CONTENT_TYPES:
+        return StreamingHttpResponse(stream_ndjson_conversion(lines, table), content_type='application/x-ndjson')
+    response = StreamingHttpResponse(stream_csv_conversion(lines, table), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="converted.csv"'
+    return response
+
 # URL configuration for the currency converter view.
 from django.urls import path
 
 urlpatterns = [
     path('convert/', currency_converter_view, name='currency_converter'),
+    path('rates/', rates_table_view, name='currency_rates'),
+    path('convert/bulk/', bulk_convert_view, name='currency_bulk_convert'),
 ]
 
 # Sample HTML template that could be used to create a frontend for the converter.
@@ -84,6 +238,7 @@ urlpatterns = [
             const formData = new FormData(e.target);
             const params = new URLSearchParams(formData);
 
+            params.set('compact', '1');
             const response = await fetch(`/convert/?${params}`);
             const data = await response.json();
             document.getElementById('result').innerText = `Converted Amount: ${data.converted_amount} ${data.to_currency}`;
@@ -94,4 +249,50 @@ urlpatterns = [
 """
 ```
 
-The provided code is a simple currency converter feature in Django. It defines a view to handle conversions, utilizes an external API to fetch exchange rates, and converts amounts between various currencies. It includes basic type annotations for clarity and uses an HTML template for the interface.
\ No newline at end of file
+```python
+# tests.py
+import csv
+import io
+import json
+
+from django.test import SimpleTestCase
+
+from .rates import RateTable
+from .views import stream_csv_conversion, stream_ndjson_conversion
+
+
+class BulkConversionTests(SimpleTestCase):
+    """
+    Unit tests for the streaming bulk conversion helpers.
+    """
+
+    def setUp(self):
+        self.table = RateTable.from_rates('USD', {'EUR': 0.5}, fetched_at=0)
+
+    def test_partial_csv_row_does_not_shift_later_rows(self):
+        lines = [b'amount,from_currency,to_currency\n', b'5,USD\n', b'2,USD,EUR\n', b'x,USD,EUR\n', b'4,EUR,USD\n']
+        rows = list(csv.DictReader(io.StringIO(b''.join(stream_csv_conversion(iter(lines), self.table)).decode())))
+
+        self.assertEqual([row['converted_amount'] for row in rows], ['', '1.0', '', '8.0'])
+        self.assertEqual([bool(row['error']) for row in rows], [True, False, True, False])
+
+    def test_partial_ndjson_record_does_not_shift_later_records(self):
+        lines = [
+            b'{"amount": 2, "from_currency": "USD"}\n',
+            b'{"amount": 2, "from_currency": "USD", "to_currency": "EUR"}\n',
+            b'not json\n',
+            b'{"amount": 4, "from_currency": "EUR", "to_currency": "USD"}\n',
+        ]
+        output = b''.join(stream_ndjson_conversion(iter(lines), self.table)).decode()
+        records = [json.loads(line) for line in output.splitlines()]
+
+        self.assertEqual([record.get('converted_amount') for record in records], [None, 1.0, None, 8.0])
+        self.assertIn('error', records[0])
+        self.assertEqual(records[2]['input'], 'not json')
+```
+
+The provided code is a simple currency converter feature in Django. It defines a view to handle conversions, utilizes an external API to fetch exchange rates (fetched in the background by `refresh_rates` and read from the latest snapshot by `rate_provider`), and converts amounts between various currencies, optionally at a historical rate via the `at` query parameter. It includes basic type annotations for clarity and uses an HTML template for the interface.
+
+By default the conversion response still embeds the full rates table. With `compact=1` it returns only the converted pair. `rates_table_view` (`/rates/`) serves the table on its own, with an `ETag` and `Last-Modified` tied to the stored snapshot version, so clients can cache it and get `304 Not Modified` until `refresh_rates` stores a new snapshot.
+
+`bulk_convert_view` converts large ledgers. Upload a CSV or NDJSON file as the raw request body, for example `curl -T ledger.csv -H 'Content-Type: text/csv' /convert/bulk/`. The view reads the body line by line, converts it in chunks of `BULK_CHUNK_ROWS` rows against one pinned rate table, and streams each converted chunk back through `StreamingHttpResponse`. Memory stays flat for multi-gigabyte files, and the first rows arrive while the upload is still being read. The bulk helpers are covered by `tests.py`, including rows with missing fields, which are reported in place without shifting the rows after them.
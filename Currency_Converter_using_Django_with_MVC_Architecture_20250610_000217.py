@@ -5,17 +5,20 @@ Title: Currency Converter using Django with MVC Architecture
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.views import View
-import requests
+from .history import rate_history, parse_at
+from .rates import rate_provider
 
 # Model: Currency conversion logic encapsulated in a function
-def convert_currency(amount, from_currency, to_currency):
+def convert_currency(amount, from_currency, to_currency, at=None):
     try:
-        # Fetch exchange rate data from an external API
-        response = requests.get("https://api.exchangerate-api.com/v4/latest/" + from_currency)
-        data = response.json()
+        # Look up the pair in the shared cross-rate table (built from the latest snapshot, no network I/O),
+        # or in the rate history when a point in time is given
+        if at:
+            rate, _ = rate_history.rate_at(from_currency, to_currency, parse_at(at))
+        else:
+            rate = rate_provider.get_rate(from_currency, to_currency)
         
         # Calculate the converted amount using the exchange rate
-        rate = data['rates'][to_currency]
         converted_amount = amount * rate
         
         return converted_amount
@@ -35,9 +38,10 @@ class CurrencyConverterView(View):
         amount = float(request.POST.get('amount'))
         from_currency = request.POST.get('from_currency')
         to_currency = request.POST.get('to_currency')
+        at = request.POST.get('at')  # Optional ISO date/datetime for a historical rate
 
         # Convert currency using the model logic
-        converted_amount = convert_currency(amount, from_currency, to_currency)
+        converted_amount = convert_currency(amount, from_currency, to_currency, at)
         
         # Return a JSON response with the converted amount
         return JsonResponse({"converted_amount": converted_amount})
@@ -64,6 +68,9 @@ class CurrencyConverterView(View):
         <label for="to_currency">To:</label>
         <input type="text" name="to_currency" value="EUR" required><br>
         
+        <label for="at">Rate date (optional):</label>
+        <input type="date" name="at"><br>
+        
         <button type="submit">Convert</button>
     </form>
     <div id="result"></div>
@@ -99,7 +106,7 @@ urlpatterns = [
 ```
 
 Note:
-1. The code uses an external API to get currency exchange rates.
+1. The code uses an external API to get currency exchange rates, fetched in the background by the `refresh_rates` command and read from the latest snapshot through `rate_provider` in `rates.py`.
 2. Ensure that you have the necessary setup for Django middleware and routes for this to function.
 3. Replace the API endpoint and key as per the actual API you're using, and handle API limits and errors appropriately.
 4. In a production environment, security measures like rate limiting and API key management should be considered.
\ No newline at end of file
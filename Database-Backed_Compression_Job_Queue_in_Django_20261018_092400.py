@@ -0,0 +1,233 @@
+Title: Database-Backed Compression Job Queue in Django
+
+```python
+# jobs.py
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from .compression_codecs import STORED
+from .models import CompressedFile, CompressionJob
+from .utils import compress_upload
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_compression(instance, codec=None, level=None):
+    """Queue `instance` for compression and mark it pending. Call inside the request's transaction."""
+    instance.status = CompressedFile.PENDING
+    instance.save(update_fields=['status'])
+    return CompressionJob.objects.create(file=instance, codec=codec or '', level=level)
+
+
+def set_status(job, status, **fields):
+    """Update the job and its file together."""
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.status = status
+    job.save(update_fields=['status', *fields])
+    CompressedFile.objects.filter(pk=job.file_id).update(status=status)
+
+
+def claim_job(worker_id):
+    """Take the oldest pending job for `worker_id`, or return None when the queue is empty."""
+    with transaction.atomic():
+        job = (
+            CompressionJob.objects.select_for_update(skip_locked=True)
+            .filter(status=CompressedFile.PENDING)
+            .order_by('id')
+            .first()
+        )
+        if job is None:
+            return None
+        set_status(job, CompressedFile.RUNNING, worker=worker_id, attempts=job.attempts + 1, heartbeat_at=timezone.now())
+    return job
+
+
+def finish_job(job, worker_id, status, error='', fields=None):
+    """
+    Record the outcome and the file's result `fields`, unless the job was
+    reclaimed from this worker in the meantime. Returns False in that case.
+    """
+    with transaction.atomic():
+        updated = CompressionJob.objects.filter(
+            pk=job.pk, worker=worker_id, status=CompressedFile.RUNNING,
+        ).update(status=status, error=error, finished_at=timezone.now())
+        if updated:
+            CompressedFile.objects.filter(pk=job.file_id).update(status=status, **(fields or {}))
+    return bool(updated)
+
+
+def reclaim_stale_jobs(timeout=None, max_attempts=None):
+    """
+    Requeue running jobs whose worker has not sent a heartbeat for `timeout`
+    seconds. A job that has already used `max_attempts` (e.g. a file that
+    crashes the worker every time) is marked failed instead.
+    """
+    timeout = timeout or getattr(settings, 'COMPRESSION_JOB_TIMEOUT', 60)
+    max_attempts = max_attempts or getattr(settings, 'COMPRESSION_JOB_MAX_ATTEMPTS', 3)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    with transaction.atomic():
+        stale = list(
+            CompressionJob.objects.select_for_update(skip_locked=True)
+            .filter(status=CompressedFile.RUNNING, heartbeat_at__lt=cutoff)
+        )
+        for job in stale:
+            logger.warning(f"Reclaiming compression job {job.pk} from unresponsive worker {job.worker}")
+            status = CompressedFile.PENDING if job.attempts < max_attempts else CompressedFile.FAILED
+            set_status(job, status, worker='', error=f"Worker {job.worker} stopped responding")
+    return len(stale)
+
+
+class Heartbeat(threading.Thread):
+    """Refresh a running job's `heartbeat_at` every `interval` seconds until stopped."""
+
+    def __init__(self, job, worker_id, interval=None):
+        super().__init__(daemon=True)
+        self.job = job
+        self.worker_id = worker_id
+        self.interval = interval or getattr(settings, 'COMPRESSION_JOB_HEARTBEAT', 10)
+        self._stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stopped.wait(self.interval):
+                try:
+                    CompressionJob.objects.filter(
+                        pk=self.job.pk, worker=self.worker_id, status=CompressedFile.RUNNING,
+                    ).update(heartbeat_at=timezone.now())
+                except DatabaseError as e:
+                    # Keep beating: one failed update must not let the job be reclaimed while it runs
+                    logger.warning(f"Heartbeat for compression job {self.job.pk} failed: {e}")
+                    connection.close()  # Reconnect on the next beat
+        finally:
+            connection.close()  # This thread's own connection
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self.join()
+
+
+def run_job(job, worker_id):
+    """Compress the job's file, keeping the heartbeat going. Returns True on success."""
+    instance = job.file
+    try:
+        with Heartbeat(job, worker_id):
+            fields = compress_upload(instance, job.codec or None, job.level)
+    except Exception as e:
+        logger.exception(f"Compression job {job.pk} failed")
+        finish_job(job, worker_id, CompressedFile.FAILED, str(e))
+        return False
+
+    if finish_job(job, worker_id, CompressedFile.DONE, fields=fields):
+        return True
+    # The job was reclaimed and belongs to another worker now: drop this result
+    logger.warning(f"Discarding result of compression job {job.pk}; it was reclaimed from {worker_id}")
+    if fields['codec'] != STORED:  # A stored result is the original upload itself
+        instance.compressed_file.storage.delete(fields['compressed_file'])
+    return False
+
+
+def work(poll_interval=None, once=False):
+    """
+    Worker loop: reclaim stale jobs, claim the next one, compress it, repeat.
+    Sleeps `poll_interval` seconds when the queue is empty; with `once` it
+    returns instead.
+    """
+    poll_interval = poll_interval or getattr(settings, 'COMPRESSION_JOB_POLL_INTERVAL', 1.0)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    while True:
+        reclaim_stale_jobs()
+        job = claim_job(worker_id)
+        if job is not None:
+            run_job(job, worker_id)
+        elif once:
+            return
+        else:
+            time.sleep(poll_interval)
+
+
+# management/commands/compression_worker.py
+import multiprocessing
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from ...jobs import work
+
+
+class Command(BaseCommand):
+    help = 'Runs a pool of worker processes that compress queued uploads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int,
+            default=getattr(settings, 'COMPRESSION_WORKER_PROCESSES', None) or os.cpu_count() or 1,
+            help='Worker processes to run. Defaults to COMPRESSION_WORKER_PROCESSES or one per core.',
+        )
+        parser.add_argument('--poll', type=float, default=None, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Drain the queue in this process and exit.')
+
+    def handle(self, *args, **options):
+        """
+        Entry point for the Django management command.
+        Each process claims jobs on its own; the parent only replaces processes
+        that exit. Jobs of a process that crashed are requeued by the others once
+        its heartbeat times out.
+        """
+        if options['once']:
+            work(options['poll'], once=True)
+            return
+
+        # Children are forked from a set-up Django; they must not share the parent's connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        processes = [None] * options['processes']
+        try:
+            while True:
+                for slot, process in enumerate(processes):
+                    if process is None or not process.is_alive():
+                        if process is not None:
+                            self.stderr.write(f"Worker {process.pid} exited with {process.exitcode}; restarting")
+                        processes[slot] = context.Process(target=work, args=(options['poll'],), daemon=True)
+                        processes[slot].start()
+                time.sleep(1)
+        except KeyboardInterrupt:
+            for process in processes:
+                if process is not None:
+                    process.terminate()
+
+
+# settings.py
+# COMPRESSION_WORKER_PROCESSES = 4  # Defaults to one per core
+# COMPRESSION_JOB_POLL_INTERVAL = 1.0  # Seconds an idle worker waits before polling again
+# COMPRESSION_JOB_HEARTBEAT = 10  # Seconds between heartbeats of a running job
+# COMPRESSION_JOB_TIMEOUT = 60  # Seconds without a heartbeat before a job is requeued
+# COMPRESSION_JOB_MAX_ATTEMPTS = 3  # Requeues before a job is marked failed
+
+
+# Run migrations, then start the workers next to the web server (e.g. under systemd or supervisor):
+# $ python manage.py makemigrations
+# $ python manage.py migrate
+# $ python manage.py compression_worker --processes 4
+```
+
+Compression no longer runs inside the upload request. `upload_file` saves the `CompressedFile` with status `pending` and adds a `CompressionJob` row in the same transaction, then redirects at once. The queue is that table. `compression_worker` starts a pool of processes, and each one claims the oldest pending job with `SELECT ... FOR UPDATE SKIP LOCKED`, so concurrent workers never take the same job and never wait on each other's locks. Each claim moves the job and its file to `running`, and `done` or `failed` is recorded with any error message.
+
+While it compresses, a worker refreshes the job's `heartbeat_at` every `COMPRESSION_JOB_HEARTBEAT` seconds from a background thread. A job whose heartbeat is older than `COMPRESSION_JOB_TIMEOUT` belonged to a worker that crashed or was killed. Any worker puts such jobs back in the queue before its next claim, and marks them failed after `COMPRESSION_JOB_MAX_ATTEMPTS`. A failed heartbeat update is logged and retried on the next beat, not fatal. Each worker compresses into its own temporary file and storage name, and `finish_job` writes the result fields only while the worker still owns the job. A result reported late by a reclaimed worker is therefore discarded, along with its stored file. Existing rows default to `done` when the `status` column is added. The parent process restarts children that exit.
+
+`GET /status/<id>/` returns a file's status as JSON, and the success page shows each upload's state, polling that endpoint until it finishes. Use PostgreSQL or MySQL 8+ for several workers: SQLite ignores `select_for_update`, so it is only safe with a single worker process.
@@ -4,38 +4,42 @@ Title: Django Feature for Generating and Scanning QR Codes
 # Install required packages:
 # pip install django qrcode[pil] pillow qrcode-reader
 
+import csv
+import io
+import json
+import os
+import re
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
 from django.shortcuts import render
-from django.http import JsonResponse
-import qrcode
-from qrcode.image.pil import PilImage
-from io import BytesIO
+from django.http import Http404, JsonResponse, StreamingHttpResponse, HttpResponseNotAllowed
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import get_valid_filename
+from django.views.decorators.csrf import csrf_exempt
 from base64 import b64encode
 from qrcode_reader import read_qr_code
+from .qr_cache import CONTENT_TYPES, check_capacity, qr_image_cache, qr_image_response, qr_options, render_qr
+from .scan_cache import read_upload_with_digest, scan_result_cache
+from .scan_service import ImageTooLarge
+
+# What qr_code_view can answer with; ?response= picks one explicitly
+RESPONSE_TYPES = ('png', 'svg', 'ref', 'base64')
 
 # Function to generate a QR code from input data
-def generate_qr_code(data):
-    # QRCode object initialization; optimized configurations
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
+def generate_qr_code(data, version=1, error_correction='L', box_size=10, border=4, renderer=None, fmt='png'):
+    # Rendered once per unique (data, options) and then served from the content-addressed cache
+    _, image = qr_image_cache.get_or_render(
+        data, version=version, error_correction=error_correction, box_size=box_size, border=border,
+        fmt=fmt, renderer=renderer,
     )
     
-    # Add data to the QRCode object
-    qr.add_data(data)
-    qr.make(fit=True)
-    
-    # Generate QR code image
-    img = qr.make_image(fill='black', back_color='white', image_factory=PilImage)
-    
-    # Save QR code to a buffer
-    buffer = BytesIO()
-    img.save(buffer, format="PNG")
-    buffer.seek(0)
-    
     # Encode the QR code image into a base64 string
-    img_str = b64encode(buffer.getvalue()).decode()
+    img_str = b64encode(image).decode()
     return img_str
 
 # Function to scan and extract data from a QR code
@@ -49,37 +53,243 @@ def scan_qr_code(image_file):
     else:
         return "No valid QR code found."
 
+# Pick the response type: ?response= wins, then an explicit image type in Accept.
+# Wildcards don't count, so legacy clients sending */* keep getting base64 JSON.
+def negotiate_qr_response(request):
+    requested = request.GET.get('response') or request.POST.get('response')
+    if requested:
+        if requested not in RESPONSE_TYPES:
+            raise ValueError(f"response must be one of {', '.join(RESPONSE_TYPES)}")
+        return requested
+    for media_type in request.headers.get('Accept', '').split(','):
+        media_type = media_type.split(';')[0].strip().lower()
+        if media_type == 'image/png':
+            return 'png'
+        if media_type == 'image/svg+xml':
+            return 'svg'
+    return 'base64'
+
 # View function for handling QR code generation
 def qr_code_view(request):
     if request.method == 'POST':
         # Retrieve data from the POST request
         data = request.POST.get('data')
-        
-        # Generate QR code
-        qr_code_img_str = generate_qr_code(data)
-        
-        # Return JSON response with base64 encoded image
-        return JsonResponse({'qr_code': qr_code_img_str})
+        if data is None:
+            return JsonResponse({'error': 'data is required'}, status=400)
+        try:
+            response_type = negotiate_qr_response(request)
+            options = qr_options(request.GET)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        if response_type in ('png', 'svg'):
+            # Raw image bytes straight from the cache, no encoding step
+            options['fmt'] = response_type
+            digest, body = qr_image_cache.get_or_render(data, **options)
+            response = qr_image_response(request, digest, body, response_type)
+        elif response_type == 'ref':
+            # Render (or find) the image now and point the client at its cacheable URL
+            digest, _ = qr_image_cache.get_or_render(data, **options)
+            url = reverse('qr_image', kwargs={'digest': digest, 'fmt': options['fmt']})
+            response = JsonResponse({
+                'digest': digest,
+                'url': request.build_absolute_uri(url),
+                'content_type': CONTENT_TYPES[options['fmt']],
+            })
+        else:
+            # Legacy clients: the image (PNG unless ?format=svg) as base64 inside JSON
+            qr_code_img_str = generate_qr_code(
+                data, options['version'], options['error_correction'], options['box_size'], options['border'],
+                options['renderer'], options['fmt'],
+            )
+            response = JsonResponse({'qr_code': qr_code_img_str, 'content_type': CONTENT_TYPES[options['fmt']]})
+        patch_vary_headers(response, ['Accept'])
+        return response
 
     return render(request, 'qr_code.html')
 
+# View function serving a cached QR image by digest (the URL returned by ?response=ref)
+def qr_image_view(request, digest, fmt):
+    if fmt not in CONTENT_TYPES or not re.fullmatch(r'[0-9a-f]{64}', digest):
+        raise Http404('Unknown QR image')
+    body = qr_image_cache.get(digest, fmt)
+    if body is None:
+        raise Http404('Unknown QR image')
+    return qr_image_response(request, digest, body, fmt)
+
 # View function for handling QR code scanning
 def scan_qr_view(request):
     if request.method == 'POST' and request.FILES.get('qr_image'):
-        # Get the uploaded image from the POST request
-        qr_image = request.FILES['qr_image']
+        # Get the uploaded image from the POST request, hashing it as it is read
+        try:
+            buffer, digest = read_upload_with_digest(request.FILES['qr_image'])
+        except ImageTooLarge as e:
+            return JsonResponse({'error': str(e)}, status=413)
         
-        # Extract data from the QR code
-        extracted_data = scan_qr_code(qr_image)
+        # Extract data from the QR code; repeat uploads of the same bytes skip decoding
+        extracted_data = scan_result_cache.get_or_scan(
+            digest, 'qrcode_reader', lambda: scan_qr_code(io.BytesIO(buffer))
+        )
         
         # Return JSON response with extracted data
         return JsonResponse({'data': extracted_data})
 
     return render(request, 'scan_qr.html')
+
+# Process pool for bulk rendering, created on first use and shared by all requests
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+def render_workers():
+    return getattr(settings, 'QR_BULK_WORKERS', None) or os.cpu_count() or 1
+
+def get_render_pool():
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(max_workers=render_workers())
+        return _render_pool
+
+# Runs in a worker process; must stay a module-level function so it can be pickled
+def render_label(data, options):
+    return render_qr(data, **options)
+
+# Write-only file object for zipfile: it collects archive bytes until they are drained.
+# Having tell() but no seek() makes zipfile write data descriptors instead of seeking back.
+class ZipStreamBuffer:
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+# Parse a bulk request: a JSON list (or {"items": [...], options}) or a CSV with a data column
+def parse_bulk_items(request):
+    max_bytes = getattr(settings, 'QR_BULK_MAX_BYTES', 64 * 1024 * 1024)
+    body = request.read(max_bytes + 1)
+    if len(body) > max_bytes:
+        raise ValueError(f'Request exceeds {max_bytes} bytes')
+
+    if request.content_type == 'text/csv':
+        reader = csv.reader(io.StringIO(body.decode('utf-8')))
+        rows = [row for row in reader if row]
+        if rows and 'data' in rows[0]:
+            header = rows.pop(0)
+            column, name_column = header.index('data'), header.index('name') if 'name' in header else None
+            items = []
+            for line, row in enumerate(rows, start=2):
+                if len(row) <= column:
+                    raise ValueError(f'CSV row {line} has no data column')
+                name = row[name_column] if name_column is not None and name_column < len(row) else None
+                items.append({'data': row[column], 'name': name})
+        else:
+            items = [{'data': row[0]} for row in rows]
+        return items, qr_options(request.GET)
+
+    payload = json.loads(body)
+    if isinstance(payload, dict):
+        items, options = payload.get('items'), qr_options(payload)
+    else:
+        items, options = payload, qr_options(request.GET)
+    if not isinstance(items, list):
+        raise ValueError('Expected a list of items')
+    return [item if isinstance(item, dict) else {'data': item} for item in items], options
+
+# Render QR images in the process pool and yield ZIP bytes as each image completes
+def stream_qr_zip(items, options, window=None):
+    pool = get_render_pool()
+    window = window or 4 * render_workers()
+    output = ZipStreamBuffer()
+    extension = options['fmt']
+    # PNGs are already deflated; storing them avoids compressing twice
+    compress_type = zipfile.ZIP_STORED if extension == 'png' else zipfile.ZIP_DEFLATED
+    pending = deque()
+    items = iter(enumerate(items, start=1))
+
+    with zipfile.ZipFile(output, 'w', compress_type) as archive:
+        while True:
+            # Keep a bounded number of renders in flight so memory stays flat
+            while len(pending) < window:
+                try:
+                    position, item = next(items)
+                except StopIteration:
+                    break
+                label_options = qr_options(item, options)
+                name = get_valid_filename(item.get('name') or f'{position:06d}')
+                pending.append((f'{name}.{label_options["fmt"]}',
+                                pool.submit(render_label, str(item['data']), label_options)))
+            if not pending:
+                break
+            name, future = pending.popleft()
+            archive.writestr(name, future.result())
+            yield output.drain()
+    yield output.drain()  # Central directory
+
+# View function for bulk QR generation streamed back as a ZIP archive
+@csrf_exempt
+def bulk_qr_zip_view(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        items, options = parse_bulk_items(request)
+        max_items = getattr(settings, 'QR_BULK_MAX_ITEMS', 100_000)
+        if len(items) > max_items:
+            raise ValueError(f'At most {max_items} items per request')
+        # Reject bad items before streaming starts; once the ZIP is under way a failure can only truncate it
+        taken = set()
+        for position, item in enumerate(items, start=1):
+            if 'data' not in item:
+                raise ValueError('Every item needs data')
+            try:
+                label_options = qr_options(item, options)
+                check_capacity(str(item['data']), label_options['error_correction'])
+                name = get_valid_filename(item.get('name') or f'{position:06d}')
+            except (ValueError, TypeError, SuspiciousFileOperation) as e:
+                raise ValueError(f'Item {position}: {e}') from None
+            # Repeated names, also after sanitising or differing only in case, get a numeric suffix
+            # so the archive never holds two entries that extract to the same file
+            unique, suffix = name, 1
+            while f'{unique}.{label_options["fmt"]}'.casefold() in taken:
+                suffix += 1
+                unique = f'{name}-{suffix}'
+            taken.add(f'{unique}.{label_options["fmt"]}'.casefold())
+            item['name'] = unique
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    response = StreamingHttpResponse(stream_qr_zip(items, options), content_type='application/zip')
+    response['Content-Disposition'] = 'attachment; filename="qr_codes.zip"'
+    return response
+
+# urls.py
+# urlpatterns = [
+#     path('qr/', qr_code_view, name='qr_code'),
+#     path('qr/scan/', scan_qr_view, name='scan_qr'),
+#     path('qr/bulk/', bulk_qr_zip_view, name='bulk_qr_zip'),
+#     path('qr/image/<str:digest>.<str:fmt>', qr_image_view, name='qr_image'),
+# ]
 ```
 
 **Note:**
 
 1. Integrate `qr_code_view` and `scan_qr_view` into your Django application by defining appropriate URL patterns in `urls.py`.
 2. Ensure templates `qr_code.html` and `scan_qr.html` are created for rendering the respective input forms and user interfaces.
-3. Modify the QR code scanning and rendering logic if needed based on your application requirements.
\ No newline at end of file
+3. Modify the QR code scanning and rendering logic if needed based on your application requirements.
+4. Generated images are cached by `qr_image_cache` (see `qr_cache.py`), so repeated payloads skip rendering and PNG encoding.
+5. Scan results are cached by `scan_result_cache` under the SHA-256 of the uploaded bytes (see `scan_cache.py`), so re-uploads of the same image skip decoding.
+6. `bulk_qr_zip_view` accepts a JSON list of payloads, `{"items": [...], "box_size": 8, ...}`, or a CSV with a `data` column, and streams back a ZIP of PNG or SVG files. Images are rendered in a process pool (`QR_BULK_WORKERS`, default one per core) with a bounded number in flight, and each file is written to the response as soon as it is ready, so the archive is never held in memory. Every item is validated before the first byte is sent: bad options, short CSV rows and payloads too long for a version 40 code are rejected with a 400 naming the item, rather than cutting the archive short. Repeated file names get a numeric suffix (`label.png`, `label-2.png`).
+7. `qr_code_view` negotiates its response. `Accept: image/png` or `image/svg+xml` (or `?response=png|svg`) returns the raw image with a strong `ETag`. `?response=ref` returns JSON with the image digest and an absolute URL served by `qr_image_view`, which browsers and CDNs can cache permanently. Clients that send no explicit image type still get the base64 JSON body (`{"qr_code": ..., "content_type": ...}`), so existing integrations keep working. It holds a PNG unless `?format=svg` asks for SVG.
@@ -16,51 +16,45 @@ urlpatterns = [
 ]
 
 # views.py
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseBadRequest
 from django.shortcuts import render
 from django.core.files.uploadedfile import UploadedFile
-import qrcode
-import cv2
-import numpy as np
+from .qr_cache import qr_image_cache, qr_image_response, qr_options
+from .scan_service import ImageTooLarge, InvalidImage, ScanBusy, read_upload, scan_service
 
 def generate_qr_code(request):
     """View function for generating a QR code."""
     if request.method == 'POST':
         data = request.POST.get('data', '')
-        qr_img = generate_qr(data)
-        response = HttpResponse(content_type='image/png')
-        qr_img.save(response, 'PNG')
-        return response
+        try:
+            # Rendering options (including ?renderer=native|pil) come from the query string
+            options = qr_options(request.GET)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        # Served from the content-addressed cache after the first render
+        digest, image = qr_image_cache.get_or_render(data, **options)
+        return qr_image_response(request, digest, image, options['fmt'])
     return render(request, 'generate_qr_code.html')
 
 def scan_qr_code(request):
     """View function for scanning a QR code."""
     if request.method == 'POST':
         qr_file = request.FILES['qr_file']
-        data = scan_uploaded_qr(qr_file)
+        try:
+            data = scan_uploaded_qr(qr_file)
+        except ImageTooLarge as e:
+            return HttpResponse(str(e), status=413)
+        except InvalidImage as e:
+            return HttpResponseBadRequest(str(e))
+        except ScanBusy:
+            return HttpResponse('QR scanner is busy, please retry', status=503)
         return HttpResponse(data)
     return render(request, 'scan_qr_code.html')
 
-def generate_qr(data):
-    """Generate a QR code from the given data."""
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
-    qr_img = qr.make_image(fill_color="black", back_color="white")
-    return qr_img
-
 def scan_uploaded_qr(qr_file: UploadedFile):
     """Scan and decode the QR code from an uploaded image file."""
-    file_data = np.frombuffer(qr_file.read(), np.uint8)
-    img = cv2.imdecode(file_data, cv2.IMREAD_COLOR)
-    detector = cv2.QRCodeDetector()
-    data, _, _ = detector.detectAndDecode(img)
-    return data
+    # Decoded in a warm worker process; raises ScanBusy when every decode slot is taken
+    return scan_service.scan(read_upload(qr_file))['data']
 
 # generate_qr_code.html
 '''
@@ -3,24 +3,65 @@ Title: Django Feature to Generate and Scan QR Codes with Logging
 ```python
 # models.py
 from django.db import models
+from .qr_cache import qr_image_cache
+
+# bulk_create skips save(), so point each row at its image here; rendering still waits for first access
+class QRCodeQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.assign_image()
+        return super().bulk_create(objs, *args, **kwargs)
 
 # Model to store QRCode information
 class QRCode(models.Model):
     data = models.TextField()
+    # SHA-256 of the payload and rendering options; rows with the same data share one image file
+    digest = models.CharField(max_length=64, db_index=True, blank=True, editable=False)
     image = models.ImageField(upload_to='qr_codes/', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = QRCodeQuerySet.as_manager()
+
     def __str__(self):
         return f"QRCode(id={self.id}, data='{self.data}')"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if self.assign_image() and update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'digest', 'image'}
+        super().save(*args, **kwargs)
+
+    def assign_image(self):
+        """Point `image` at the content-addressed file for `data`. Returns True if it changed."""
+        digest, name = qr_image_cache.name_for(self.data)
+        if digest == self.digest:
+            return False  # Data unchanged: keep the existing image
+        self.digest = digest
+        self.image.name = name
+        return True
+
+    def render_image(self):
+        """Return the PNG bytes, rendering and storing the file on first access only."""
+        _, png = qr_image_cache.get_or_render(self.data)
+        return png
+
+    @property
+    def image_url(self):
+        # The digest covers QR_RENDERER, so a row saved under another renderer is re-pointed first
+        if self.pk and self.assign_image():
+            self.save(update_fields=['digest', 'image'])
+        self.render_image()  # Make sure the file exists before handing out its URL
+        return self.image.url
+
 # views.py
+import hashlib
 import logging
-import os
-import qrcode
 from django.shortcuts import render, redirect, get_object_or_404
-from django.conf import settings
 from .models import QRCode
-from qrtools import QR
+from .qr_cache import qr_image_cache, qr_image_response
+from .scan_cache import scan_result_cache
+from .scan_service import InvalidImage, ScanBusy, scan_service
 
 # Initialize logger
 logger = logging.getLogger(__name__)
@@ -29,13 +70,9 @@ logger = logging.getLogger(__name__)
 def generate_qr_code(request):
     if request.method == 'POST':
         data = request.POST.get('data')
-        # Generate QR code image
-        img = qrcode.make(data)
-        img_path = os.path.join(settings.MEDIA_ROOT, 'qr_codes', f"{data}.png")
-        img.save(img_path)
-
-        # Save QR code info in the database
-        qr_code = QRCode(data=data, image=f'qr_codes/{data}.png')
+        # Save QR code info in the database; the image is stored once per unique payload
+        # and rendered the first time it is requested
+        qr_code = QRCode(data=data)
         qr_code.save()
 
         # Log the QR code generation
@@ -45,15 +82,41 @@ def generate_qr_code(request):
 
     return render(request, 'generate_qr.html')
 
+# View serving the QR code image, rendered on first request
+def qr_code_image(request, qr_code_id):
+    qr_code = get_object_or_404(QRCode, pk=qr_code_id)
+    # The digest comes from the current data, not the column, which is empty on older rows.
+    # The row's data can change, so clients must revalidate this URL rather than cache it for good.
+    digest, png = qr_image_cache.get_or_render(qr_code.data)
+    return qr_image_response(request, digest, png, immutable=False)
+
+# Decode a stored QR image in memory, once per unique image
+def decode_stored_image(qr_code):
+    with qr_code.image.open('rb') as f:
+        body = f.read()
+    digest = hashlib.sha256(body).hexdigest()
+    result = scan_result_cache.get_or_scan(digest, 'opencv', lambda: scan_service.scan(body))
+    return result['data'] if result['found'] else None
+
 # View to scan a QR code
 def scan_qr_code(request, qr_code_id):
     qr_code = get_object_or_404(QRCode, pk=qr_code_id)
-    qr = QR(filename=qr_code.image.path)
 
-    if qr.decode():
+    if qr_code.digest and qr_code.digest == qr_image_cache.name_for(qr_code.data)[0]:
+        # The image was rendered from the stored payload, so there is nothing to decode
+        data = qr_code.data
+    else:
+        # Rows whose image did not come from qr_image_cache (e.g. created before it existed)
+        try:
+            data = decode_stored_image(qr_code)
+        except (OSError, InvalidImage, ScanBusy) as e:
+            logger.error(f"Failed to scan QR code with ID: {qr_code_id}: {e}")
+            data = None
+
+    if data:
         # Log the decoded QR code data
-        logger.info(f"Scanned QR code with data: {qr.data}")
-        return render(request, 'scan_qr.html', {'data': qr.data})
+        logger.info(f"Scanned QR code with data: {data}")
+        return render(request, 'scan_qr.html', {'data': data})
     else:
         logger.error(f"Failed to scan QR code with ID: {qr_code_id}")
         return render(request, 'scan_qr.html', {'error': 'Failed to scan the QR code.'})
@@ -84,6 +147,7 @@ from . import views
 urlpatterns = [
     path('generate/', views.generate_qr_code, name='generate_qr'),
     path('scan/<int:qr_code_id>/', views.scan_qr_code, name='qr_code_detail'),
+    path('image/<int:qr_code_id>/', views.qr_code_image, name='qr_code_image'),
 ]
 
 # settings.py adjustments for media files
@@ -112,4 +176,4 @@ LOGGING = {
 # by setting up the MEDIA_URL and MEDIA_ROOT as shown above.
 ```
 
-This implementation uses the `qrcode` library to generate QR codes and the `qrtools` library to scan them. Logging is used to track QR code generation and scanning activities. Adjust logging configurations as needed for your environment.
\ No newline at end of file
+This implementation uses the `qrcode` library to generate QR codes and OpenCV (through `scan_service`) to scan them. Images are content-addressed: each `QRCode` row stores the SHA-256 `digest` of its payload, and its `image` points at `qr_cache/<xx>/<digest>.png` in `qr_image_cache` (see `qr_cache.py`). Rows with the same data share one file. The file is rendered the first time `qr_code_image`, `image_url` or a scan needs it, not when the row is created, so `QRCode.objects.bulk_create(...)` only writes rows. `qr_code_image` sends the image with an `ETag` and `Cache-Control: no-cache`, because editing a row's data changes the image behind the same URL; clients revalidate and usually get a `304`. Saves that leave `data` unchanged keep the existing image. `scan_qr_code` answers from the stored payload whenever the row's image was rendered from it. Only older rows with some other image are decoded, in memory through `scan_service`, with the result cached by image hash in `scan_result_cache`. Logging is used to track QR code generation and scanning activities. Adjust logging configurations as needed for your environment.
\ No newline at end of file
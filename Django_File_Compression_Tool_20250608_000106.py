@@ -5,76 +5,153 @@ Title: Django File Compression Tool
 from django.db import models
 
 class CompressedFile(models.Model):
+    PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
     original_file = models.FileField(upload_to='uploads/')
     compressed_file = models.FileField(upload_to='compressed/', null=True, blank=True)
     compression_ratio = models.FloatField(null=True, blank=True)
+    # Name of the codec in compression_codecs.CODECS that produced compressed_file, or 'none'
+    # when the upload would not compress and compressed_file is the original stored as-is
+    codec = models.CharField(max_length=16, default='gzip')
+    # Compression runs in a worker (see jobs.py); this tracks where the file is in the queue.
+    # enqueue_compression sets PENDING; the default covers rows compressed before the queue existed
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=DONE)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"Compressed {self.original_file.name}"
 
+class CompressionJob(models.Model):
+    """
+    Queue entry for compressing one CompressedFile.
+
+    Workers claim pending jobs with SELECT ... FOR UPDATE SKIP LOCKED, so each
+    job goes to exactly one worker without an external broker. A running job
+    whose `heartbeat_at` stops advancing belonged to a worker that died, and is
+    put back in the queue (see `reclaim_stale_jobs`).
+    """
+    file = models.OneToOneField(CompressedFile, on_delete=models.CASCADE, related_name='job')
+    codec = models.CharField(max_length=16, blank=True)  # '' means COMPRESSION_CODEC
+    level = models.IntegerField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=CompressedFile.STATUS_CHOICES, default=CompressedFile.PENDING, db_index=True)
+    worker = models.CharField(max_length=100, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"CompressionJob(file={self.file_id}, status={self.status}, attempts={self.attempts})"
+
 # views.py
+from django.db import transaction
 from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, JsonResponse
 from .models import CompressedFile
 from .forms import FileUploadForm
-from .utils import compress_file
+from .jobs import enqueue_compression
 
 def upload_file(request):
     if request.method == 'POST':
         form = FileUploadForm(request.POST, request.FILES)
         if form.is_valid():
-            instance = form.save()
-            # Perform compression
-            compress_file(instance)
+            with transaction.atomic():
+                instance = form.save()
+                # Queue compression with the chosen codec and level; compression_worker picks it up
+                enqueue_compression(instance, form.cleaned_data['codec'], form.cleaned_data['level'])
             return HttpResponseRedirect('/success/')
     else:
         form = FileUploadForm()
     return render(request, 'upload.html', {'form': form})
 
 def success(request):
-    files = CompressedFile.objects.all()
+    files = CompressedFile.objects.select_related('job')
     return render(request, 'success.html', {'files': files})
 
+def compression_status(request, pk):
+    file = get_object_or_404(CompressedFile.objects.select_related('job'), pk=pk)
+    job = getattr(file, 'job', None)
+    return JsonResponse({
+        'id': file.pk,
+        'status': file.status,
+        'codec': file.codec if file.status == CompressedFile.DONE else None,
+        'compression_ratio': file.compression_ratio,
+        'compressed_file': file.compressed_file.url if file.compressed_file else None,
+        'attempts': job.attempts if job else 0,
+        'error': job.error if job and file.status == CompressedFile.FAILED else '',
+    })
+
 # forms.py
 from django import forms
+from django.conf import settings
 from .models import CompressedFile
+from .compression_codecs import AUTO, CODECS, codec_options
 
 class FileUploadForm(forms.ModelForm):
+    codec = forms.ChoiceField(
+        choices=[(AUTO, 'Automatic')] + [(name, name) for name in CODECS],
+        initial=lambda: getattr(settings, 'COMPRESSION_CODEC', 'gzip'),
+    )
+    level = forms.IntegerField(required=False, help_text='Leave empty for the codec default.')
+
     class Meta:
         model = CompressedFile
         fields = ['original_file']
 
+    def clean(self):
+        cleaned_data = super().clean()
+        try:
+            codec_options(cleaned_data)
+        except ValueError as e:
+            raise forms.ValidationError(str(e))
+        return cleaned_data
+
 # utils.py
 import os
-from django.core.files.base import ContentFile
-from django.core.files.storage import default_storage
-import gzip
-
-def compress_file(instance):
+import tempfile
+from django.core.files import File
+from .compression_codecs import CODECS, STORED, compress_path
+
+def compress_upload(instance, codec=None, level=None):
+    """
+    Compress instance.original_file and put the result in storage. Returns the
+    CompressedFile field values (compressed_file, compression_ratio, codec)
+    without saving the instance.
+    """
     original_path = instance.original_file.path
-    compressed_path = original_path + '.gz'
-    
-    # Compress the file
-    with open(original_path, 'rb') as original_file:
-        with gzip.open(compressed_path, 'wb') as compressed_file:
-            compressed_file.writelines(original_file)
-
-    # Calculate compression ratio
-    original_size = os.path.getsize(original_path)
-    compressed_size = os.path.getsize(compressed_path)
-    compression_ratio = compressed_size / original_size
-
-    # Save compressed file and ratio
-    with open(compressed_path, 'rb') as f:
-        file_name = os.path.basename(compressed_path)
-        instance.compressed_file.save(file_name, ContentFile(f.read()), save=False)
-    
-    instance.compression_ratio = compression_ratio
-    instance.save()
-
-    # Clean up compressed local file
-    os.remove(compressed_path)
+
+    # A private local file, so two workers handling the same upload never share one
+    fd, compressed_path = tempfile.mkstemp(suffix='.part', dir=os.path.dirname(original_path))
+    os.close(fd)
+    try:
+        # Compress the file; codec 'auto' picks one by trial on a sample (see compression_codecs.py)
+        result = compress_path(original_path, codec, level, target_path=compressed_path)
+
+        if result['codec'] == STORED:
+            # Already compressed (JPEG, MP4, ZIP...): keep the upload as it is instead of a copy
+            return {'compressed_file': instance.original_file.name, 'compression_ratio': 1.0, 'codec': STORED}
+
+        # Calculate compression ratio
+        original_size, compressed_size = result['original_size'], result['compressed_size']
+        compression_ratio = compressed_size / original_size if original_size else 1.0
+
+        # Save compressed file, streamed to storage rather than read into memory; storage picks a unique name
+        with open(compressed_path, 'rb') as f:
+            file_name = os.path.basename(original_path) + CODECS[result['codec']].extension
+            instance.compressed_file.save(file_name, File(f), save=False)
+        return {'compressed_file': instance.compressed_file.name, 'compression_ratio': compression_ratio, 'codec': result['codec']}
+    finally:
+        # Clean up compressed local file
+        os.remove(compressed_path)
+
+def compress_file(instance, codec=None, level=None):
+    # Synchronous variant: saves only the result fields, never status
+    fields = compress_upload(instance, codec, level)
+    for name, value in fields.items():
+        setattr(instance, name, value)
+    instance.save(update_fields=list(fields))
 
 # urls.py
 from django.urls import path 
@@ -83,6 +160,7 @@ from . import views
 urlpatterns = [
     path('', views.upload_file, name='upload'),
     path('success/', views.success, name='success'),
+    path('status/<int:pk>/', views.compression_status, name='compression_status'),
 ]
 
 # upload.html
@@ -100,22 +178,44 @@ urlpatterns = [
 # success.html
 """
 {% block content %}
-  <h2>Successful Uploads</h2>
+  <h2>Uploads</h2>
   {% if files %}
     <ul>
       {% for file in files %}
-        <li>
+        <li data-status-url="{% url 'compression_status' file.pk %}" data-status="{{ file.status }}">
           Original File: {{ file.original_file.name }} - 
-          Compressed File: {{ file.compressed_file.name }} - 
-          Compression Ratio: {{ file.compression_ratio|floatformat:2 }}
+          {% if file.status != 'done' %}
+            {{ file.get_status_display }}{% if file.status == 'failed' %}: {{ file.job.error }}{% endif %}
+          {% elif file.codec == 'none' %}
+            Stored as-is (already compressed)
+          {% else %}
+            Compressed File: {{ file.compressed_file.name }} - 
+            Codec: {{ file.codec }} - 
+            Compression Ratio: {{ file.compression_ratio|floatformat:2 }}
+          {% endif %}
         </li>
       {% endfor %}
     </ul>
   {% else %}
     <p>No files have been uploaded yet.</p>
   {% endif %}
+  <script>
+    // Reload once any pending or running upload changes state
+    const waiting = document.querySelectorAll('li[data-status="pending"], li[data-status="running"]');
+    if (waiting.length) {
+      setInterval(async () => {
+        for (const item of waiting) {
+          const response = await fetch(item.dataset.statusUrl);
+          if ((await response.json()).status !== item.dataset.status) {
+            location.reload();
+            return;
+          }
+        }
+      }, 2000);
+    }
+  </script>
 {% endblock %}
 """
 ```
 
-The above code creates a simple Django-based file compression tool following the MVC architecture. It allows users to upload files, which are then compressed using gzip and stored, along with a computed compression ratio. The `CompressedFile` model stores original and compressed files, while views handle uploading and displaying results. Utility function `compress_file` performs the actual file compression.
\ No newline at end of file
+The above code creates a simple Django-based file compression tool following the MVC architecture. It allows users to upload files, which are then compressed in the background (see the compression job queue) with the codec and level chosen on the form (gzip, bz2, lzma, and zstd, lz4 or brotli when installed, or `auto` to pick one per file) and stored, along with a computed compression ratio. The `CompressedFile` model stores original and compressed files and a `status` (pending, running, done, failed). The views handle uploading, queueing a `CompressionJob`, displaying results, and `/status/<id>/` for polling. Utility function `compress_file` performs the actual file compression through `compression_codecs.compress_path`, and `CompressedFile.codec` records which codec was used. Uploads whose sample does not compress (JPEG, MP4, ZIP and the like) skip compression: `codec` is `'none'` and `compressed_file` points at the original. gzip goes through `pgzip.py`, which deflates large files on several cores and still writes a standard `.gz`.
\ No newline at end of file
@@ -1,14 +1,84 @@
 Title: Django File Compression Tool with Unit Tests
 
 ```python
-# File: compression_tool/views.py
+# File: compression_tool/streaming.py
 
-import os
-import tempfile
+import itertools
+import time
 import zipfile
-from django.http import HttpResponse
+import zlib
+
+
+class ZipStreamSink:
+    """
+    Write-only file object that collects ZIP bytes until they are drained.
+    It has tell() but no seek(), so zipfile writes data descriptors after each
+    entry instead of seeking back to patch the local headers.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def is_compressible(sample, min_saving=0.05):
+    """
+    Trial-compress `sample` with zlib at level 1. Saving less than `min_saving`
+    means the content is already compressed (JPEG, MP4, ZIP and the like).
+    """
+    return bool(sample) and len(zlib.compress(sample, 1)) <= len(sample) * (1 - min_saving)
+
+
+def stream_zip(files, chunk_size=64 * 1024, compression=zipfile.ZIP_DEFLATED):
+    """
+    Yield a ZIP archive of `files` (Django UploadedFile objects) piece by piece.
+
+    Each upload is read and compressed `chunk_size` bytes at a time and the
+    compressed bytes are yielded as soon as they are produced, so memory use
+    depends on the chunk size, not on the size of the uploads. Uploads whose
+    first chunk does not compress are stored in the archive without compression.
+    """
+    sink = ZipStreamSink()
+    with zipfile.ZipFile(sink, 'w', compression) as archive:
+        for file_obj in files:
+            chunks = file_obj.chunks(chunk_size)
+            first = next(chunks, b'')
+            info = zipfile.ZipInfo(file_obj.name, date_time=time.localtime()[:6])
+            info.compress_type = compression if is_compressible(first) else zipfile.ZIP_STORED
+            info.file_size = file_obj.size  # Lets zipfile decide on ZIP64 before writing the header
+            with archive.open(info, 'w') as entry:
+                for chunk in itertools.chain([first], chunks):
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            yield sink.drain()  # Rest of the compressed stream and the data descriptor
+    yield sink.drain()  # Central directory
+```
+
+```python
+# File: compression_tool/views.py
+
+from django.http import HttpResponse, StreamingHttpResponse
 from django.views import View
 from django.core.files.uploadedfile import UploadedFile
+from .streaming import stream_zip
 
 class FileCompressionView(View):
     """
@@ -18,28 +88,25 @@ class FileCompressionView(View):
     def post(self, request, *args, **kwargs):
         """
         Handle POST request to compress uploaded files into a ZIP archive.
+        The archive is streamed back while it is being compressed.
         """
-        files = request.FILES.getlist('file')
+        files = [file_obj for file_obj in request.FILES.getlist('file') if isinstance(file_obj, UploadedFile)]
         if not files:
             return HttpResponse("No files uploaded.", status=400)
 
-        with tempfile.NamedTemporaryFile(delete=True, suffix='.zip') as temp_zip:
-            with zipfile.ZipFile(temp_zip, 'w') as zip_archive:
-                for file_obj in files:
-                    if isinstance(file_obj, UploadedFile):
-                        # Write each uploaded file into the zip archive
-                        zip_archive.writestr(file_obj.name, file_obj.read())
-
-            # Send the compressed file back as a response
-            temp_zip.seek(0)
-            response = HttpResponse(temp_zip.read(), content_type='application/zip')
-            response['Content-Disposition'] = 'attachment; filename="compressed_files.zip"'
-            return response
+        # Send the compressed files back as they are produced
+        response = StreamingHttpResponse(stream_zip(files), content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="compressed_files.zip"'
+        return response
 ```
 
 ```python
 # File: compression_tool/tests.py
 
+import io
+import os
+import zipfile
+
 from django.test import TestCase, Client
 from django.core.files.uploadedfile import SimpleUploadedFile
 
@@ -65,7 +132,7 @@ class FileCompressionViewTests(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertTrue(response['Content-Type'] == 'application/zip')
-        self.assertIn(b'test.txt', response.content)
+        self.assertIn(b'test.txt', b''.join(response.streaming_content))
 
     def test_compression_with_multiple_files(self):
         """
@@ -83,8 +150,45 @@ class FileCompressionViewTests(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertTrue(response['Content-Type'] == 'application/zip')
-        self.assertIn(b'hello.txt', response.content)
-        self.assertIn(b'another.txt', response.content)
+        content = b''.join(response.streaming_content)
+        self.assertIn(b'hello.txt', content)
+        self.assertIn(b'another.txt', content)
+
+    def test_streamed_archive_round_trip(self):
+        """
+        Test that the streamed archive unpacks to the uploaded bytes, including a multi-chunk file.
+        """
+        large_content = os.urandom(256 * 1024) + b"a" * (512 * 1024)
+        uploaded_files = [
+            SimpleUploadedFile("large.bin", large_content),
+            SimpleUploadedFile("small.txt", b"small"),
+        ]
+
+        response = self.client.post('/compress/', {'file': uploaded_files})
+        chunks = list(response.streaming_content)
+
+        self.assertGreater(len(chunks), 2)
+        with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(archive.read('large.bin'), large_content)
+            self.assertEqual(archive.read('small.txt'), b"small")
+
+    def test_incompressible_upload_is_stored(self):
+        """
+        Test that already-compressed content is stored and text is deflated.
+        """
+        random_content = os.urandom(128 * 1024)
+        uploaded_files = [
+            SimpleUploadedFile("photo.jpg", random_content),
+            SimpleUploadedFile("notes.txt", b"compress me " * 1000),
+        ]
+
+        response = self.client.post('/compress/', {'file': uploaded_files})
+
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(archive.getinfo('photo.jpg').compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(archive.getinfo('notes.txt').compress_type, zipfile.ZIP_DEFLATED)
+            self.assertEqual(archive.read('photo.jpg'), random_content)
 
     def test_compression_with_no_file(self):
         """
@@ -140,6 +244,6 @@ INSTALLED_APPS = [
 Instructions:
 1. Add the compression_tool to your Django project's `INSTALLED_APPS`.
 2. Create a URL route to handle file uploads for compression.
-3. Use a Django view to compress uploaded files into a ZIP archive.
+3. Use a Django view to compress uploaded files into a ZIP archive. The archive is streamed with `StreamingHttpResponse`: uploads are compressed in 64 KB chunks and sent as they are produced, so memory use stays flat and the download starts immediately. Uploads whose first chunk does not shrink under a quick zlib trial (JPEGs, videos, ZIPs) are stored in the archive instead of being deflated again.
 4. Write unit tests to ensure the tool's functionality is correct.
 ```
\ No newline at end of file
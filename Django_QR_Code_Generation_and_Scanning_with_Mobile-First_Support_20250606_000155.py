@@ -3,23 +3,48 @@ Title: Django QR Code Generation and Scanning with Mobile-First Support
 ```python
 # models.py
 from django.db import models
-import qrcode  # Library for generating QR codes
-from io import BytesIO
-from django.core.files import File
+from .qr_cache import qr_image_cache  # Content-addressed QR image storage
+
+class QRCodeQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create skips save(); assign image names here and leave rendering for first access
+        objs = list(objs)
+        for obj in objs:
+            obj.assign_image()
+        return super().bulk_create(objs, *args, **kwargs)
 
 class QRCode(models.Model):
     data = models.TextField()
+    digest = models.CharField(max_length=64, db_index=True, blank=True, editable=False)
     qr_image = models.ImageField(upload_to='qr_codes/', blank=True)
 
+    objects = QRCodeQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
-        # Generate QR code image
-        qr = qrcode.make(self.data)
-        buffer = BytesIO()
-        qr.save(buffer, format='PNG')
-        # Save image to field
-        self.qr_image.save(f'qr_{self.id}.png', File(buffer), save=False)
+        # Only a change to data needs a new image; the file is shared by every row with the same data
+        update_fields = kwargs.get('update_fields')
+        if self.assign_image() and update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'digest', 'qr_image'}
         super().save(*args, **kwargs)
 
+    def assign_image(self):
+        """Point `qr_image` at the content-addressed file for `data`. Returns True if it changed."""
+        digest, name = qr_image_cache.name_for(self.data)
+        if digest == self.digest:
+            return False
+        self.digest = digest
+        self.qr_image.name = name
+        return True
+
+    @property
+    def qr_image_url(self):
+        # The digest covers QR_RENDERER, so a row saved under another renderer is re-pointed first
+        if self.pk and self.assign_image():
+            self.save(update_fields=['digest', 'qr_image'])
+        # Rendered and stored on first access only
+        qr_image_cache.get_or_render(self.data)
+        return self.qr_image.url
+
 # forms.py
 from django import forms
 
@@ -79,4 +104,4 @@ urlpatterns = [
 '''
 ```
 
-This feature allows users to generate QR codes by entering data into a form. To support mobile-first design, the template uses Bootstrap for responsive design elements. Users can generate QR codes via the `/create/` endpoint.
\ No newline at end of file
+This feature allows users to generate QR codes by entering data into a form. To support mobile-first design, the template uses Bootstrap for responsive design elements. Users can generate QR codes via the `/create/` endpoint. Each QR image is stored once per unique payload under its content hash (see `qr_cache.py`) and rendered the first time `qr_image_url` is read. Saving a `QRCode` without changing `data` does not touch the image, and `QRCode.objects.bulk_create(...)` inserts rows without rendering anything.
\ No newline at end of file
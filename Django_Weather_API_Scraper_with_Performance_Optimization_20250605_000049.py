@@ -4,6 +4,7 @@ Title: Django Weather API Scraper with Performance Optimization
 import requests
 from django.utils import timezone
 from myapp.models import WeatherData
+from myapp.upstream import upstream
 
 # Define constants for weather API
 API_URL = 'https://api.weatherapi.com/v1/current.json'
@@ -23,7 +24,12 @@ def fetch_weather_data(city):
     if recent_data:
         return recent_data
 
-    response = requests.get(API_URL, params={'key': API_KEY, 'q': city})
+    # Pooled keep-alive connection with a timeout
+    try:
+        response = upstream.get(API_URL, params={'key': API_KEY, 'q': city})
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching data: {e}")
+        return None
 
     # Process response
     if response.status_code == 200:
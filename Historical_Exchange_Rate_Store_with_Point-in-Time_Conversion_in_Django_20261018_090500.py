@@ -0,0 +1,244 @@
+Title: Historical Exchange Rate Store with Point-in-Time Conversion in Django
+
+```python
+# history.py
+import fcntl
+import os
+import threading
+from datetime import datetime, time as dt_time, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .rates import RateTable, RatesUnavailable
+
+EMPTY_TIMESTAMPS = np.empty(0, dtype='<i8')
+EMPTY_RATES = np.empty(0, dtype='<f8')
+
+
+def parse_at(value):
+    """
+    Parse an `at=` query value (ISO date or datetime) into an aware datetime.
+    A bare date means the rate in effect at the end of that day (UTC).
+    Raises ValueError for anything else.
+    """
+    # Checked first: parse_datetime also accepts a bare date, as midnight, on Python 3.11+
+    day = parse_date(value)
+    if day is not None:
+        when = datetime.combine(day, dt_time.max)
+    else:
+        when = parse_datetime(value)
+        if when is None:
+            raise ValueError(f"Invalid date: '{value}'")
+    if timezone.is_naive(when):
+        when = when.replace(tzinfo=dt_timezone.utc)
+    return when
+
+
+class RateSeries:
+    """
+    Append-only time series of one currency's rate against the base currency.
+
+    Stored as two memory-mapped files: `<code>.ts` (int64 epoch seconds, ascending)
+    and `<code>.rate` (float64). The rate is written before its timestamp, so a
+    reader never sees a timestamp without its rate. Writers hold an exclusive lock
+    on `<code>.lock` and first trim a record that a crash left half-written.
+    """
+
+    def __init__(self, path):
+        self.ts_path = f'{path}.ts'
+        self.rate_path = f'{path}.rate'
+        self.lock_path = f'{path}.lock'
+        self._size = -1
+        self._timestamps = EMPTY_TIMESTAMPS
+        self._rates = EMPTY_RATES
+
+    def arrays(self):
+        """Return (timestamps, rates), re-mapping the files only when they have grown."""
+        try:
+            size = os.path.getsize(self.ts_path)
+        except FileNotFoundError:
+            return EMPTY_TIMESTAMPS, EMPTY_RATES
+        if size != self._size:
+            count = min(size, os.path.getsize(self.rate_path)) // 8
+            if count:
+                self._timestamps = np.memmap(self.ts_path, dtype='<i8', mode='r', shape=(count,))
+                self._rates = np.memmap(self.rate_path, dtype='<f8', mode='r', shape=(count,))
+            else:
+                self._timestamps, self._rates = EMPTY_TIMESTAMPS, EMPTY_RATES
+            self._size = size
+        return self._timestamps, self._rates
+
+    def append(self, timestamp, rate):
+        # Overlapping refresh_rates runs (cron plus --interval) take turns here
+        with open(self.lock_path, 'ab') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            with open(self.rate_path, 'ab') as rates, open(self.ts_path, 'ab') as timestamps:
+                # A crash between the two writes leaves .rate one record longer; cut both
+                # files back to the complete records. Readers never map past that length.
+                count = min(rates.tell(), timestamps.tell()) // 8
+                for f in (rates, timestamps):
+                    if f.tell() != count * 8:
+                        f.truncate(count * 8)
+
+                if count:
+                    with open(self.ts_path, 'rb') as f:
+                        f.seek((count - 1) * 8)
+                        if timestamp <= int(np.frombuffer(f.read(8), dtype='<i8')[0]):
+                            return  # Already recorded; the series only grows forward in time
+                rates.write(np.float64(rate).astype('<f8').tobytes())
+                rates.flush()
+                timestamps.write(np.int64(timestamp).astype('<i8').tobytes())
+
+    def value_at(self, timestamp):
+        """Return (timestamp, rate) of the last point at or before `timestamp`, or None."""
+        timestamps, rates = self.arrays()
+        i = int(np.searchsorted(timestamps, timestamp, side='right')) - 1
+        if i < 0:
+            return None
+        return int(timestamps[i]), float(rates[i])
+
+    def between(self, start, end):
+        """Return (timestamps, rates) views for points with start <= timestamp <= end."""
+        timestamps, rates = self.arrays()
+        lo = np.searchsorted(timestamps, start, side='left')
+        hi = np.searchsorted(timestamps, end, side='right')
+        return timestamps[lo:hi], rates[lo:hi]
+
+
+class RateHistory:
+    """
+    Point-in-time store of base-currency rate tables, one `RateSeries` per currency.
+
+    `refresh_rates` appends every snapshot it stores; lookups bisect the
+    memory-mapped timestamp arrays and never touch the upstream API.
+    """
+
+    def __init__(self, root=None, base=None):
+        self.base = (base or getattr(settings, 'CURRENCY_RATES_BASE', 'USD')).upper()
+        root = root or getattr(settings, 'CURRENCY_HISTORY_DIR', None) or os.path.join(settings.BASE_DIR, 'rate_history')
+        self.root = os.path.join(root, self.base)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def series(self, code):
+        """Return the series for `code`. Raises KeyError if no history exists for it."""
+        code = code.upper()
+        series = self._series.get(code)
+        if series is None:
+            path = os.path.join(self.root, code)
+            if not code.isalpha() or not os.path.exists(f'{path}.ts'):
+                raise KeyError(code)
+            with self._lock:
+                series = self._series.setdefault(code, RateSeries(path))
+        return series
+
+    def codes(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name[:-3] for name in os.listdir(self.root) if name.endswith('.ts'))
+
+    def append(self, rates, when):
+        """Record a {currency: rate} table (against the base currency) as of `when`."""
+        os.makedirs(self.root, exist_ok=True)
+        timestamp = int(when.timestamp())
+        for code, rate in rates.items():
+            with self._lock:
+                series = self._series.setdefault(code, RateSeries(os.path.join(self.root, code)))
+            series.append(timestamp, rate)
+
+    def rate_at(self, from_currency, to_currency, when):
+        """
+        Return (rate, as_of) for one pair at `when`.
+        Raises KeyError for a currency with no history, RatesUnavailable if none was recorded before `when`.
+        """
+        timestamp = when.timestamp()
+        points = []
+        for code in (from_currency.upper(), to_currency.upper()):
+            point = self.series(code).value_at(timestamp)
+            if point is None:
+                raise RatesUnavailable(f"No {code} rate recorded at or before {when.isoformat()}")
+            points.append(point)
+        (from_ts, from_rate), (to_ts, to_rate) = points
+        return to_rate / from_rate, datetime.fromtimestamp(max(from_ts, to_ts), dt_timezone.utc)
+
+    def table_at(self, when):
+        """Return a `RateTable` of every currency as it stood at `when`."""
+        timestamp = when.timestamp()
+        codes, base_rates, latest = [], [], None
+        for code in self.codes():
+            point = self.series(code).value_at(timestamp)
+            if point is not None:
+                codes.append(code)
+                base_rates.append(point[1])
+                latest = point[0] if latest is None else max(latest, point[0])
+        if not codes:
+            raise RatesUnavailable(f"No rates recorded at or before {when.isoformat()}")
+        return RateTable(self.base, codes, base_rates, latest)
+
+    def rates_between(self, from_currency, to_currency, start, end):
+        """
+        Return (timestamps, rates) for one pair over [start, end] as NumPy arrays.
+        Each timestamp where either currency changed carries the rate in effect at that moment.
+        """
+        from_series, to_series = self.series(from_currency), self.series(to_currency)
+        start, end = start.timestamp(), end.timestamp()
+        timestamps = np.union1d(from_series.between(start, end)[0], to_series.between(start, end)[0])
+        rates = []
+        for series in (from_series, to_series):
+            all_timestamps, all_rates = series.arrays()
+            if not len(all_rates):
+                rates.append(np.full(len(timestamps), np.nan))
+                continue
+            i = np.searchsorted(all_timestamps, timestamps, side='right') - 1
+            rates.append(np.where(i >= 0, all_rates[np.maximum(i, 0)], np.nan))
+        return timestamps, rates[1] / rates[0]
+
+
+# Shared by every view in the process
+rate_history = RateHistory()
+
+
+# settings.py
+# CURRENCY_HISTORY_DIR = BASE_DIR / 'rate_history'  # One directory per base currency
+```
+
+```python
+# tests.py
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+
+from django.test import SimpleTestCase
+
+from .history import RateHistory, parse_at
+from .rates import RatesUnavailable
+
+
+class RateHistoryTests(SimpleTestCase):
+    """
+    Unit tests for point-in-time lookups in the rate history.
+    """
+
+    def setUp(self):
+        self.history = RateHistory(root=tempfile.mkdtemp(), base='USD')
+        self.history.append({'USD': 1.0, 'EUR': 0.5}, datetime(2024, 1, 15, 15, 0, tzinfo=dt_timezone.utc))
+
+    def test_bare_date_uses_rate_at_end_of_day(self):
+        table = self.history.table_at(parse_at('2024-01-15'))
+
+        self.assertEqual(table.rate('USD', 'EUR'), 0.5)
+
+    def test_datetime_before_first_snapshot_has_no_rate(self):
+        with self.assertRaises(RatesUnavailable):
+            self.history.table_at(parse_at('2024-01-15T12:00:00'))
+
+    def test_invalid_value_is_rejected(self):
+        with self.assertRaises(ValueError):
+            parse_at('yesterday')
+```
+
+`RateHistory` keeps an append-only time series for every currency, stored as a pair of memory-mapped files (timestamps and rates) under `CURRENCY_HISTORY_DIR`. Each time `refresh_rates` stores a snapshot, it also appends that snapshot to the history. Appends take a per-currency file lock, so overlapping `refresh_rates` runs cannot interleave. A record left half-written by a crash is trimmed before the next append, so timestamps and rates always stay paired. A point-in-time lookup is one `searchsorted` bisect per currency on the mapped timestamp array. `table_at()` rebuilds a full `RateTable` for a moment in the past, so historical conversions use the same cross-rate code as live ones. `rates_between()` answers bulk range queries for a currency pair with NumPy arrays.
+
+The conversion views take an optional `at=` parameter (an ISO date or datetime) and then convert at the rate in effect at that moment. A bare date means the end of that day in UTC.
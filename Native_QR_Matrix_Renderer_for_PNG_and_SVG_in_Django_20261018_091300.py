@@ -0,0 +1,106 @@
+Title: Native QR Matrix Renderer for PNG and SVG in Django
+
+```python
+# Install required packages:
+# pip install django qrcode numpy
+
+# qr_render.py
+import struct
+import zlib
+from decimal import Context, Decimal, Inexact
+
+import numpy as np
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+SVG_NAMESPACE = 'http://www.w3.org/2000/svg'
+# Same attributes, in the same order, as qrcode's SvgPathImage
+SVG_PATH_STYLE = 'id="qr-path" fill="#000000" fill-opacity="1" fill-rule="nonzero" stroke="none"'
+
+
+def module_matrix(modules, border):
+    """Return the QR module matrix (True = dark) as a bool array with the quiet zone added."""
+    return np.pad(np.asarray(modules, dtype=bool), border, constant_values=False)
+
+
+def _png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def render_png(modules, box_size=10, border=4, level=6):
+    """
+    Encode a QR module matrix as a 1-bit grayscale PNG.
+
+    Each module is scaled to `box_size` pixels with `np.repeat` and the rows are
+    bit-packed directly, so no image object or per-box drawing is involved. The
+    decoded pixels are identical to qrcode's PIL output for black on white.
+    """
+    matrix = module_matrix(modules, border)
+    size = matrix.shape[0] * box_size
+    # In 1-bit grayscale 0 is black, so dark modules are the cleared bits.
+    # Pack one row per module first; repeating packed rows keeps memory at 1 bit per pixel.
+    rows = np.packbits(np.repeat(~matrix, box_size, axis=1), axis=1)
+    scanlines = np.zeros((size, rows.shape[1] + 1), dtype=np.uint8)  # Column 0: filter type None
+    scanlines[:, 1:] = np.repeat(rows, box_size, axis=0)
+
+    header = struct.pack('>IIBBBBB', size, size, 1, 0, 0, 0, 0)  # 1-bit, grayscale, no interlace
+    return b''.join([
+        PNG_SIGNATURE,
+        _png_chunk(b'IHDR', header),
+        _png_chunk(b'IDAT', zlib.compress(scanlines.tobytes(), level)),
+        _png_chunk(b'IEND', b''),
+    ])
+
+
+def _mm(pixels):
+    """Millimetres as qrcode's SVG images write them: 10 pixels = 1mm, trailing zeros trimmed."""
+    units = (Decimal(pixels) / 10).quantize(Decimal('0.001'))
+    context = Context(traps=[Inexact])
+    try:
+        for step in (Decimal('0.01'), Decimal('0.1'), Decimal('0')):
+            units = units.quantize(step, context=context)
+    except Inexact:
+        pass
+    return f'{units}mm'
+
+
+def render_svg(modules, box_size=10, border=4):
+    """
+    Encode a QR module matrix as a standalone SVG with a single path.
+
+    The document matches qrcode's SvgPathImage, but each horizontal run of dark
+    modules becomes one rectangle instead of one rectangle per module, which
+    typically makes the path several times shorter while drawing the same shape.
+    """
+    matrix = np.asarray(modules, dtype=bool)
+    count = matrix.shape[0]
+    # Position of every module edge in the units SvgPathImage uses for its path
+    edges = [str(Decimal((i + border) * box_size) / 10) for i in range(count + 1)]
+
+    # Run starts and ends per row, from the edges of the zero-padded row
+    padded = np.zeros((count, count + 2), dtype=np.int8)
+    padded[:, 1:-1] = matrix
+    changes = np.diff(padded, axis=1)
+    starts_y, starts_x = np.nonzero(changes == 1)
+    _, ends_x = np.nonzero(changes == -1)  # Row-major order, so they pair with the starts
+
+    path = ''.join(
+        f'M{edges[x0]},{edges[y]}H{edges[x1]}V{edges[y + 1]}H{edges[x0]}z'
+        for y, x0, x1 in zip(starts_y.tolist(), starts_x.tolist(), ends_x.tolist())
+    )
+    pixel_size = (count + 2 * border) * box_size
+    dimension = _mm(pixel_size)
+    view_box = Decimal(pixel_size) / 10
+    return (
+        "<?xml version='1.0' encoding='UTF-8'?>\n"
+        f'<svg width="{dimension}" height="{dimension}" version="1.1" viewBox="0 0 {view_box} {view_box}" '
+        f'xmlns="{SVG_NAMESPACE}"><path d="{path}" {SVG_PATH_STYLE} /></svg>'
+    ).encode('utf-8')
+
+
+# settings.py
+# QR_RENDERER = 'native'  # or 'pil'; a request can override it with ?renderer=
+```
+
+`qr_render.py` turns the module matrix of a `qrcode.QRCode` straight into image bytes. `render_png` scales the matrix with `np.repeat`, bit-packs each row and writes a 1-bit grayscale PNG with `zlib`, skipping PIL's box-by-box drawing and image encoder. The decoded pixels are identical to the PIL output, and the file is usually smaller because no PNG row filters are tried. `render_svg` produces the same document as `SvgPathImage`, except that each horizontal run of dark modules is merged into one rectangle. It renders the same shape from a much shorter path.
+
+`render_qr` in `qr_cache.py` uses this renderer by default (`QR_RENDERER = 'native'`). A request can choose the renderer with `?renderer=native` or `?renderer=pil`. Both renderers draw the same pixels, but their PNG and SVG bytes differ (the native SVG merges runs into fewer paths). The renderer is therefore part of the cache digest, so `?renderer=pil` is honoured on a warm cache and one `ETag` never names two different bodies.
@@ -0,0 +1,93 @@
+Title: Parallel Gzip Compression for Large Files in Django
+
+```python
+# pgzip.py
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+DICTIONARY_SIZE = 32 * 1024  # Deflate window: the most history a block can refer back to
+
+
+def compress_block(block, dictionary, level, last):
+    """
+    Deflate one block as a raw stream fragment, primed with the preceding 32 KB.
+    Non-final blocks end with a sync flush (byte-aligned, not marked final), so the
+    fragments concatenate into one valid deflate stream. zlib releases the GIL here.
+    """
+    if dictionary:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def gzip_header(level, mtime=None):
+    extra_flags = 2 if level == 9 else 4 if level == 1 else 0
+    return struct.pack('<BBBBIBB', 0x1F, 0x8B, 8, 0, int(mtime if mtime is not None else time.time()), extra_flags, 255)
+
+
+def compress_stream(source, target, level=None, workers=None, block_size=None):
+    """
+    Gzip `source` (a binary file object) into `target` using several cores, pigz-style.
+
+    The input is cut into `block_size` blocks that are deflated concurrently in a
+    thread pool. Each block uses the last 32 KB of the previous one as its
+    dictionary, so the ratio stays close to single-threaded gzip. Blocks are
+    written in order. The CRC-32 is computed sequentially as blocks are read, and
+    at most 2 x `workers` blocks are in flight, which bounds memory.
+    Returns (bytes read, bytes written).
+    """
+    level = level if level is not None else getattr(settings, 'PGZIP_LEVEL', 6)
+    workers = workers or getattr(settings, 'PGZIP_WORKERS', None) or os.cpu_count() or 1
+    block_size = block_size or getattr(settings, 'PGZIP_BLOCK_SIZE', 1024 * 1024)
+
+    header = gzip_header(level)
+    target.write(header)
+    written, total, crc = len(header), 0, 0
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        dictionary = b''
+        block = source.read(block_size)
+        while True:
+            # Read one block ahead so the final block is known when it is submitted
+            following = source.read(block_size) if block else b''
+            crc = zlib.crc32(block, crc)
+            total += len(block)
+            pending.append(pool.submit(compress_block, block, dictionary, level, not following))
+            dictionary = block[-DICTIONARY_SIZE:]
+
+            while pending and (len(pending) >= 2 * workers or not following):
+                data = pending.popleft().result()
+                target.write(data)
+                written += len(data)
+            if not following:
+                break
+            block = following
+
+    trailer = struct.pack('<II', crc & 0xFFFFFFFF, total & 0xFFFFFFFF)
+    target.write(trailer)
+    return total, written + len(trailer)
+
+
+def gzip_file(source_path, target_path, level=None, workers=None, block_size=None):
+    """Gzip the file at `source_path` to `target_path`. Returns (original size, compressed size)."""
+    with open(source_path, 'rb') as source, open(target_path, 'wb') as target:
+        return compress_stream(source, target, level, workers, block_size)
+
+
+# settings.py
+# PGZIP_WORKERS = 8  # Compression threads; defaults to one per core
+# PGZIP_BLOCK_SIZE = 1024 * 1024  # Input bytes per block
+# PGZIP_LEVEL = 6
+```
+
+`pgzip.py` is a parallel gzip compressor in the style of `pigz`. `compress_stream` cuts the input into blocks (`PGZIP_BLOCK_SIZE`, 1 MB by default) and deflates them concurrently on a `ThreadPoolExecutor` with `PGZIP_WORKERS` threads. `zlib` releases the GIL while compressing, so the threads really run on separate cores. Each block is primed with the last 32 KB of the block before it and ends with a sync flush, except the last, which finishes the stream. The compressed blocks therefore join into one ordinary deflate stream, which the main thread writes in order between a standard gzip header and a trailer with the CRC-32 and size. The output is a normal `.gz` file that `gzip`, `gunzip` and Python's `gzip` module read unchanged, and its size is within a fraction of a percent of single-threaded `gzip` at the same level. Only 2 × `workers` blocks are in memory at once.
+
+`compress_file` in the file compression tool and `FileCompressionView.compress_file` now call `gzip_file`.
@@ -0,0 +1,259 @@
+Title: Pluggable Compression Codecs with Automatic Selection in Django
+
+```python
+# compression_codecs.py
+import bz2
+import lzma
+import os
+import time
+import zlib
+
+from django.conf import settings
+
+from . import pgzip
+
+# Optional codecs, registered only when their packages are installed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+AUTO = 'auto'
+STORED = 'none'  # Recorded for uploads kept as they are because they would not compress
+CHUNK_SIZE = 1024 * 1024
+
+
+class Codec:
+    """
+    One compression format. `compressor(level)` returns an object with
+    `compress(bytes)` and `flush()`. `stream(source, target, level)`, if given,
+    replaces the generic chunked loop in `compress_stream` (e.g. for multi-core
+    gzip) and returns (bytes read, bytes written).
+    """
+
+    def __init__(self, name, extension, levels, default_level, compressor, stream=None):
+        self.name = name
+        self.extension = extension
+        self.levels = levels
+        self.default_level = default_level
+        self.compressor = compressor
+        self.stream = stream
+
+    def __repr__(self):
+        return f'Codec({self.name!r})'
+
+    def compress(self, data, level=None):
+        compressor = self.compressor(self.default_level if level is None else level)
+        return compressor.compress(data) + compressor.flush()
+
+    def compress_stream(self, source, target, level=None):
+        level = self.default_level if level is None else level
+        if self.stream:
+            return self.stream(source, target, level)
+        compressor = self.compressor(level)
+        read = written = 0
+        while chunk := source.read(CHUNK_SIZE):
+            read += len(chunk)
+            data = compressor.compress(chunk)
+            target.write(data)
+            written += len(data)
+        data = compressor.flush()
+        target.write(data)
+        return read, written + len(data)
+
+
+class LZ4Compressor:
+    """lz4.frame with the compress/flush interface: the frame header goes out with the first output."""
+
+    def __init__(self, level):
+        self._compressor = lz4.frame.LZ4FrameCompressor(compression_level=level)
+        self._header = self._compressor.begin()
+
+    def compress(self, data):
+        header, self._header = self._header, b''
+        return header + self._compressor.compress(data)
+
+    def flush(self):
+        header, self._header = self._header, b''
+        return header + self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.finish()
+
+
+def zstd_stream(source, target, level):
+    # zstd splits the input across its own worker threads
+    return zstandard.ZstdCompressor(level=level, threads=-1).copy_stream(source, target)
+
+
+CODECS = {}
+
+
+def register(codec):
+    CODECS[codec.name] = codec
+    return codec
+
+
+register(Codec(
+    'gzip', '.gz', range(1, 10), 6,
+    lambda level: zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16),
+    stream=lambda source, target, level: pgzip.compress_stream(source, target, level),
+))
+register(Codec('bz2', '.bz2', range(1, 10), 9, bz2.BZ2Compressor))
+register(Codec('lzma', '.xz', range(0, 10), 6, lambda level: lzma.LZMACompressor(preset=level)))
+if zstandard:
+    register(Codec(
+        'zstd', '.zst', range(1, 23), 3,
+        lambda level: zstandard.ZstdCompressor(level=level).compressobj(), stream=zstd_stream,
+    ))
+if lz4:
+    register(Codec('lz4', '.lz4', range(0, 17), 0, LZ4Compressor))
+if brotli:
+    register(Codec('brotli', '.br', range(0, 12), 5, BrotliCompressor))
+
+# Candidates tried by the auto mode, skipping codecs that are not installed
+AUTO_CANDIDATES = [
+    ('lz4', 0), ('zstd', 3), ('zstd', 12), ('gzip', 1), ('gzip', 6),
+    ('brotli', 5), ('bz2', 9), ('lzma', 6),
+]
+
+
+def codec_options(params, defaults=None):
+    """
+    Read the codec and level from a query dict or form data. `codec` is a
+    registered name or 'auto'. Raises ValueError for unknown codecs and
+    out-of-range levels.
+    """
+    options = dict(defaults or {'codec': getattr(settings, 'COMPRESSION_CODEC', 'gzip'), 'level': None})
+    if params.get('codec'):
+        options['codec'] = str(params['codec']).lower()
+    if params.get('level') not in (None, ''):
+        options['level'] = int(params['level'])
+
+    if options['codec'] != AUTO and options['codec'] not in CODECS:
+        raise ValueError(f"codec must be auto or one of {', '.join(CODECS)}")
+    if options['level'] is not None:
+        if options['codec'] == AUTO:
+            raise ValueError('level cannot be combined with codec=auto')
+        levels = CODECS[options['codec']].levels
+        if options['level'] not in levels:
+            raise ValueError(f"level for {options['codec']} must be {levels.start}-{levels.stop - 1}")
+    return options
+
+
+def sample_file(path, size=None, blocks=4):
+    """Read `blocks` evenly spaced blocks from the file, about `size` bytes in all."""
+    size = size or getattr(settings, 'COMPRESSION_AUTO_SAMPLE_SIZE', 256 * 1024)
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        if file_size <= size:
+            return f.read()
+        block_size = size // blocks
+        step = (file_size - block_size) // (blocks - 1)
+        parts = []
+        for i in range(blocks):
+            f.seek(i * step)
+            parts.append(f.read(block_size))
+        return b''.join(parts)
+
+
+def is_compressible(sample, min_saving=None):
+    """
+    Trial-compress `sample` with zlib at level 1, the cheapest deflate. Content that
+    saves less than `min_saving` (COMPRESSION_MIN_SAVING, 5%) is treated as already
+    compressed (JPEG, MP4, ZIP and the like); no codec would do much better on it.
+    """
+    if not sample:
+        return False
+    min_saving = getattr(settings, 'COMPRESSION_MIN_SAVING', 0.05) if min_saving is None else min_saving
+    return len(zlib.compress(sample, 1)) <= len(sample) * (1 - min_saving)
+
+
+def choose_codec(sample, candidates=None):
+    """
+    Compress `sample` with each installed candidate and return the (codec, level)
+    that saved the most bytes per CPU second of this thread.
+    """
+    candidates = candidates or getattr(settings, 'COMPRESSION_AUTO_CANDIDATES', AUTO_CANDIDATES)
+    best, best_score = None, None
+    for name, level in candidates:
+        codec = CODECS.get(name)
+        if codec is None:
+            continue
+        started = time.thread_time()
+        saved = len(sample) - len(codec.compress(sample, level))
+        elapsed = max(time.thread_time() - started, 1e-6)
+        # When nothing saves space, the cheapest candidate wins
+        score = saved / elapsed if saved > 0 else -elapsed
+        if best_score is None or score > best_score:
+            best, best_score = (codec, level), score
+    return best or (CODECS['gzip'], CODECS['gzip'].default_level)
+
+
+def compress_path(source_path, codec=None, level=None, precheck=None, target_path=None):
+    """
+    Compress the file at `source_path` to `target_path`, by default a sibling file
+    named after the codec. `codec` is a registered name, 'auto' or None
+    (COMPRESSION_CODEC). Returns a dict with the codec name, level, target path
+    and both sizes.
+
+    With `precheck` (COMPRESSION_SKIP_INCOMPRESSIBLE by default) a file whose sample
+    does not compress is left alone: the result has codec STORED and points at
+    `source_path` itself.
+    """
+    options = codec_options({'codec': codec, 'level': level})
+    precheck = getattr(settings, 'COMPRESSION_SKIP_INCOMPRESSIBLE', True) if precheck is None else precheck
+    sample = sample_file(source_path) if precheck or options['codec'] == AUTO else None
+
+    if precheck and not is_compressible(sample):
+        size = os.path.getsize(source_path)
+        return {'codec': STORED, 'level': None, 'path': source_path, 'original_size': size, 'compressed_size': size}
+    if options['codec'] == AUTO:
+        selected, level = choose_codec(sample)
+    else:
+        selected, level = CODECS[options['codec']], options['level']
+    level = selected.default_level if level is None else level
+
+    target_path = target_path or source_path + selected.extension
+    with open(source_path, 'rb') as source, open(target_path, 'wb') as target:
+        original_size, compressed_size = selected.compress_stream(source, target, level)
+    return {
+        'codec': selected.name,
+        'level': level,
+        'path': target_path,
+        'original_size': original_size,
+        'compressed_size': compressed_size,
+    }
+
+
+# settings.py
+# COMPRESSION_CODEC = 'gzip'  # Default when a request does not choose; 'auto' samples every upload
+# COMPRESSION_AUTO_SAMPLE_SIZE = 256 * 1024  # Bytes sampled (from 4 places in the file) by auto mode
+# COMPRESSION_AUTO_CANDIDATES = [('zstd', 3), ('gzip', 6), ('lzma', 6)]  # (codec, level) pairs to try
+# COMPRESSION_SKIP_INCOMPRESSIBLE = True  # Store uploads whose sample does not compress as they are
+# COMPRESSION_MIN_SAVING = 0.05  # Smallest saving on the sample that counts as compressible
+```
+
+`compression_codecs.py` is a registry of compression formats. gzip (multi-core through `pgzip.py`), bz2 and lzma are always available. zstd (`zstandard`, multi-threaded for whole files), lz4 (`lz4`) and brotli (`brotli`) are registered only when their packages are installed. Each `Codec` has a file extension, its valid level range and default level, and a streaming compressor, so whole files are compressed in 1 MB chunks without loading them into memory. A new format is added with `register(Codec(...))`.
+
+`codec_options` validates a `codec`/`level` pair from request data the same way `qr_options` does for QR rendering. With `codec=auto`, `choose_codec` compresses a 256 KB sample taken from four places in the file with every installed `(codec, level)` in `COMPRESSION_AUTO_CANDIDATES`. It keeps the one that saved the most bytes per CPU second on that sample. This measure favours fast codecs; shorten the candidate list to trade speed for ratio.
+
+Before compressing, `compress_path` trial-compresses the same sample with zlib at level 1, which takes a few milliseconds. If that saves less than `COMPRESSION_MIN_SAVING` (5%), the file is already compressed (JPEG, MP4, ZIP and the like). It is left as it is, and the result's codec is `STORED` ('none'), so those uploads cost no compression CPU at all.
+
+The upload form and `FileCompressionView` accept `codec` and `level`. `CompressedFile.codec` records the format used for each file.
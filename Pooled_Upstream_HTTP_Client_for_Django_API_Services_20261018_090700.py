@@ -0,0 +1,283 @@
+Title: Pooled Upstream HTTP Client for Django API Services
+
+```python
+# Install required packages:
+# pip install requests httpx
+
+# upstream.py
+import asyncio
+import threading
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+
+class UpstreamClient:
+    """
+    Shared HTTP client for every call to an external API.
+
+    Connections are kept alive and reused between requests, each host gets at
+    most `max_per_host` concurrent connections, and every call has a timeout.
+    `get` is for regular views and commands; `aget` is the same call for ASGI views.
+    Each event loop gets its own async client, closed when that loop shuts down.
+    """
+
+    def __init__(self, max_per_host=None, timeout=None, max_hosts=20):
+        self.max_per_host = max_per_host or getattr(settings, 'UPSTREAM_MAX_CONNECTIONS_PER_HOST', 10)
+        self.timeout = timeout or getattr(settings, 'UPSTREAM_TIMEOUT', 10)
+        self.max_hosts = max_hosts
+        self._session = None
+        self._lock = threading.Lock()
+        self._async_clients = weakref.WeakKeyDictionary()  # event loop -> (AsyncClient, {host: Semaphore}, closer)
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    # pool_block makes callers wait for a free connection instead of opening more
+                    adapter = HTTPAdapter(
+                        pool_connections=self.max_hosts, pool_maxsize=self.max_per_host, pool_block=True
+                    )
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    def get(self, url, params=None, **kwargs):
+        """Blocking GET over the shared connection pool. Raises requests exceptions."""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, params=params, **kwargs)
+
+    async def aget(self, url, params=None, **kwargs):
+        """Non-blocking GET for async views. Raises httpx exceptions."""
+        client, host_limits, _ = await self._async_state()
+        host = urlsplit(url).netloc
+        limit = host_limits.get(host)
+        if limit is None:
+            limit = host_limits[host] = asyncio.Semaphore(self.max_per_host)
+        kwargs.setdefault('timeout', self.timeout)
+        async with limit:
+            return await client.get(url, params=params, **kwargs)
+
+    async def _async_state(self):
+        # httpx clients are bound to the event loop they were created on
+        loop = asyncio.get_running_loop()
+        state = self._async_clients.get(loop)
+        if state is None:
+            limits = httpx.Limits(
+                max_connections=self.max_per_host * self.max_hosts,
+                max_keepalive_connections=self.max_per_host * self.max_hosts,
+            )
+            client = httpx.AsyncClient(limits=limits)
+            closer = self._close_on_shutdown(client)
+            await closer.__anext__()  # Registers with the loop; asyncio.run and async_to_sync finalize it on exit
+            state = self._async_clients[loop] = (client, {}, closer)
+        return state
+
+    @staticmethod
+    async def _close_on_shutdown(client):
+        # An async generator parked at its yield is closed by loop.shutdown_asyncgens()
+        try:
+            yield
+        finally:
+            await client.aclose()
+
+    async def aclose(self):
+        """Close the async client of the running event loop."""
+        state = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state[2].aclose()
+
+    def close(self):
+        """Close the sync session, and the async clients of loops that are not running."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        for loop, (_, _, closer) in list(self._async_clients.items()):
+            if loop.is_running():
+                continue  # Closed by aclose() or when that loop shuts down
+            if not loop.is_closed():
+                loop.run_until_complete(closer.aclose())
+            self._async_clients.pop(loop, None)
+
+
+# Shared by every fetcher in the process
+upstream = UpstreamClient()
+
+
+# stub_server.py
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+STUB_RATES = {'USD': 1.0, 'EUR': 0.92, 'GBP': 0.79, 'JPY': 151.3, 'INR': 83.4, 'CAD': 1.36}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers exchange-rate and weather requests with canned JSON after an injected delay."""
+    protocol_version = 'HTTP/1.1'  # Keep-alive, so connection reuse is observable
+    disable_nagle_algorithm = True  # Headers and body go out separately; avoid delayed-ACK stalls
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency + random.uniform(0, server.jitter))
+        url = urlsplit(self.path)
+        with server.stats_lock:
+            server.requests += 1
+
+        if url.path.startswith('/v4/latest/'):
+            base = url.path.rsplit('/', 1)[-1].upper()
+            if base not in STUB_RATES:
+                return self._send(404, {'error': f'Unknown base {base}'})
+            rates = {code: rate / STUB_RATES[base] for code, rate in STUB_RATES.items()}
+            return self._send(200, {'base': base, 'rates': rates})
+
+        if url.path.startswith('/weather') or url.path.startswith('/v1/current.json'):
+            query = parse_qs(url.query)
+            city = (query.get('q') or query.get('city') or ['London'])[0]
+            # Includes the fields read by each of the weather fetchers
+            return self._send(200, {
+                'name': city,
+                'main': {'temp': 18.5},
+                'weather': [{'description': 'light rain'}],
+                'current': {'temp_c': 18.5, 'condition': {'text': 'Light rain'}},
+            })
+
+        self._send(404, {'error': 'Not found'})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep test and benchmark output quiet
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, jitter=0.0):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self.connections = 0
+        self.stats_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self.stats_lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+@contextmanager
+def run_stub_server(latency=0.0, jitter=0.0):
+    """Run a StubServer on a free local port for the duration of the block."""
+    server = StubServer(latency, jitter)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# tests.py
+import asyncio
+import time
+
+import requests
+from django.test import SimpleTestCase
+
+from .stub_server import run_stub_server
+from .upstream import UpstreamClient
+
+
+class UpstreamClientTests(SimpleTestCase):
+    """
+    Unit tests for the pooled upstream client against the local stub server.
+    """
+
+    def test_connections_are_reused(self):
+        client = UpstreamClient(max_per_host=2)
+        with run_stub_server() as server:
+            for _ in range(20):
+                client.get(f'{server.url}/v4/latest/USD').raise_for_status()
+        client.close()
+        self.assertEqual(server.requests, 20)
+        self.assertEqual(server.connections, 1)
+
+    def test_latency_is_measured_per_request(self):
+        client = UpstreamClient()
+        with run_stub_server(latency=0.05) as server:
+            client.get(f'{server.url}/v4/latest/USD')  # Open the connection first
+            started = time.perf_counter()
+            for _ in range(5):
+                client.get(f'{server.url}/v4/latest/EUR')
+            elapsed = (time.perf_counter() - started) / 5
+        client.close()
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertLess(elapsed, 0.5)
+
+    def test_timeout_is_applied(self):
+        client = UpstreamClient(timeout=0.1)
+        with run_stub_server(latency=0.5) as server:
+            with self.assertRaises(requests.exceptions.Timeout):
+                client.get(f'{server.url}/v4/latest/USD')
+        client.close()
+
+    def test_async_get_limits_connections_per_host(self):
+        client = UpstreamClient(max_per_host=3)
+
+        async def fetch_many(url):
+            responses = await asyncio.gather(*(client.aget(url) for _ in range(12)))
+            return [response.json()['base'] for response in responses]
+
+        with run_stub_server(latency=0.02) as server:
+            bases = asyncio.run(fetch_many(f'{server.url}/v4/latest/GBP'))
+        self.assertEqual(bases, ['GBP'] * 12)
+        self.assertLessEqual(server.connections, 3)
+
+    def test_async_client_is_closed_with_its_loop(self):
+        client = UpstreamClient()
+
+        async def fetch(url):
+            await client.aget(url)
+            return (await client._async_state())[0]
+
+        with run_stub_server() as server:
+            async_client = asyncio.run(fetch(f'{server.url}/v4/latest/USD'))
+        self.assertTrue(async_client.is_closed)
+
+
+# settings.py
+# UPSTREAM_TIMEOUT = 10  # Seconds; applied to every upstream call
+# UPSTREAM_MAX_CONNECTIONS_PER_HOST = 10
+#
+# Point the fetchers at the stub server for local latency measurements:
+# CURRENCY_RATES_API_URL = 'http://127.0.0.1:8001/v4/latest/{base}'
+```
+
+`upstream.py` gives every external API call one shared client. The sync path uses a `requests.Session` whose `HTTPAdapter` keeps connections alive and blocks once `UPSTREAM_MAX_CONNECTIONS_PER_HOST` connections to a host are in use. The async path uses an `httpx.AsyncClient` per event loop plus a per-host semaphore. Each client is closed when its loop shuts down, or by `aclose()`/`close()`. Connections are pooled only while the loop lives, so `aget` is meant for views served under ASGI. An async view run through `async_to_sync` gets a new loop, and therefore a new client, on every call. Both apply `UPSTREAM_TIMEOUT` unless a call passes its own. The exchange-rate provider and all the weather fetchers now go through `upstream.get`, and `WeatherAPIService` also has an `afetch_weather` for ASGI views.
+
+`stub_server.py` serves canned exchange-rate and weather JSON from a local port, with configurable latency and jitter. It counts requests and TCP connections, so the tests can confirm that connections are reused and measure per-request latency without reaching the real providers.
@@ -2,13 +2,11 @@ Title: QR Code Generation and Scanning in Django
 
 ```python
 # Import necessary libraries
-import qrcode
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render
-from django.core.files.base import ContentFile
-import cv2  # OpenCV for QR code scanning
-import numpy as np
-from django.core.files.uploadedfile import InMemoryUploadedFile
+from .qr_cache import qr_image_cache, qr_image_response, qr_options
+from .scan_cache import read_upload_with_digest, scan_result_cache
+from .scan_service import ImageTooLarge, InvalidImage, ScanBusy, scan_service  # OpenCV decoding in worker processes
 
 # Function to generate a QR code
 def generate_qr_code(request, data):
@@ -20,29 +18,20 @@ def generate_qr_code(request, data):
         data (str): The data to encode in the QR code.
         
     Returns:
-        HttpResponse: An HTTP response containing the QR code image.
+        HttpResponse: An HTTP response containing the QR code image, with a strong
+        ETag and immutable caching (304 when the client already has it).
+        Query parameters such as `format=svg` or `renderer=pil` select how it is rendered.
     """
-    # Create a QR code object
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    
-    # Add data to the QR code
-    qr.add_data(data)
-    qr.make(fit=True)
-
-    # Create an image from the QR code instance
-    img = qr.make_image(fill='black', back_color='white')
+    try:
+        options = qr_options(request.GET)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
 
-    # Save the image to a BytesIO stream
-    byte_io = ContentFile(b'')
-    img.save(byte_io, format='PNG')
+    # Render once per unique payload; repeats come from the content-addressed cache
+    digest, image = qr_image_cache.get_or_render(data, **options)
 
     # Return the image as an HTTP response
-    return HttpResponse(byte_io.getvalue(), content_type='image/png')
+    return qr_image_response(request, digest, image, options['fmt'])
 
 
 # Function to scan a QR code
@@ -59,28 +48,90 @@ def scan_qr_code(request):
     if request.method == 'POST' and request.FILES['qr_image']:
         # Retrieve the uploaded image file
         qr_image = request.FILES['qr_image']
-        
-        # Read image file into OpenCV format
-        file_bytes = np.asarray(bytearray(qr_image.read()), dtype=np.uint8)
-        img = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
-
-        # Initialize QR code detector
-        detector = cv2.QRCodeDetector()
 
-        # Detect and decode the QR code
-        data, vertices_array, _ = detector.detectAndDecode(img)
-
-        if vertices_array is not None:
-            # If a QR code is detected
-            return HttpResponse(f'Decoded data: {data}')
-        else:
-            return HttpResponse('No QR code detected')
+        # Read (and hash) the upload once; a repeat of the same bytes is answered from the cache,
+        # anything new is decoded with the shared, already-initialized detectors
+        try:
+            buffer, digest = read_upload_with_digest(qr_image)
+            result = scan_result_cache.get_or_scan(digest, 'opencv', lambda: scan_service.scan(buffer))
+        except ImageTooLarge as e:
+            return HttpResponse(str(e), status=413)
+        except InvalidImage as e:
+            return HttpResponseBadRequest(str(e))
+        except ScanBusy:
+            return HttpResponse('QR scanner is busy, please retry', status=503)
+        return scan_response(result)
 
     else:
         # In case of GET request or no file uploaded
         return render(request, 'upload_qr.html')
 
 
+# Async variant of scan_qr_code for ASGI deployments
+async def scan_qr_code_async(request):
+    """
+    Same as `scan_qr_code`, but awaits the decode so the event loop keeps serving
+    other requests while the image is processed.
+    """
+    if request.method == 'POST' and request.FILES.get('qr_image'):
+        # Shares cached results with scan_qr_code: both decode with OpenCV
+        try:
+            buffer, digest = read_upload_with_digest(request.FILES['qr_image'])
+            result = await scan_result_cache.aget_or_scan(digest, 'opencv', lambda: scan_service.ascan(buffer))
+        except ImageTooLarge as e:
+            return HttpResponse(str(e), status=413)
+        except InvalidImage as e:
+            return HttpResponseBadRequest(str(e))
+        except ScanBusy:
+            return HttpResponse('QR scanner is busy, please retry', status=503)
+        return scan_response(result)
+    return render(request, 'upload_qr.html')
+
+
+# Function to scan every QR code in an image or a short GIF/MJPEG clip
+def scan_qr_codes(request):
+    """
+    Finds all QR codes in an uploaded image, animated GIF or MJPEG clip.
+
+    Args:
+        request (HttpRequest): POST with a `qr_image` file. Optional query parameters:
+            `max_codes` stops the scan once that many distinct codes are found, and
+            `frame_step` scans only every Nth frame of a clip.
+
+    Returns:
+        JsonResponse: `{"found", "codes": [{"data", "points", "box", "frame"}], "frames_scanned"}`.
+    """
+    if request.method != 'POST' or not request.FILES.get('qr_image'):
+        return JsonResponse({'error': 'POST a qr_image file'}, status=400)
+    try:
+        max_codes = int(request.GET['max_codes']) if request.GET.get('max_codes') else None
+        frame_step = int(request.GET.get('frame_step') or 1)
+        if (max_codes is not None and max_codes < 1) or frame_step < 1:
+            raise ValueError
+    except ValueError:
+        return JsonResponse({'error': 'max_codes and frame_step must be positive integers'}, status=400)
+
+    try:
+        buffer, digest = read_upload_with_digest(request.FILES['qr_image'])
+        result = scan_result_cache.get_or_scan(
+            digest, f'opencv-all:{max_codes}:{frame_step}', lambda: scan_service.scan_all(buffer, max_codes, frame_step)
+        )
+    except ImageTooLarge as e:
+        return JsonResponse({'error': str(e)}, status=413)
+    except InvalidImage as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except ScanBusy:
+        return JsonResponse({'error': 'QR scanner is busy, please retry'}, status=503)
+    return JsonResponse(result)
+
+
+def scan_response(result):
+    if result['found']:
+        # If a QR code is detected
+        return HttpResponse(f"Decoded data: {result['data']}")
+    return HttpResponse('No QR code detected')
+
+
 # views.py file where the above functions are defined should be properly wired in urls.py
 ```
 
@@ -95,4 +146,4 @@ In your templates, you would need an `upload_qr.html` file with a form for uploa
 </form>
 ```
 
-This code defines two main functions, `generate_qr_code` for generating QR codes with given data, and `scan_qr_code` for decoding data from uploaded QR code images. The `qr_code` library is used for generating QR codes, while OpenCV is employed to scan and decode QR codes from images.
\ No newline at end of file
+This code defines two main functions, `generate_qr_code` for generating QR codes with given data, and `scan_qr_code` for decoding data from uploaded QR code images. `scan_qr_codes` returns every code found in a photo or a short GIF/MJPEG clip as JSON, with bounding boxes. The `qr_code` library is used for generating QR codes, while OpenCV is employed to scan and decode QR codes from images.
\ No newline at end of file
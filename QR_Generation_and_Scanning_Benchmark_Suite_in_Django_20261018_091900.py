@@ -0,0 +1,218 @@
+Title: QR Generation and Scanning Benchmark Suite in Django
+
+```python
+# management/commands/bench_qr.py
+import json
+import platform
+import random
+import statistics
+import string
+import time
+from datetime import datetime, timezone
+
+import cv2
+import django
+import numpy as np
+import qrcode
+import qrcode.util
+from django.core.management.base import BaseCommand, CommandError
+
+from ...qr_cache import ERROR_CORRECTION, render_qr
+from ...scan_service import decode_image, get_detector
+
+
+def parse_ints(value):
+    """Parse '1-40', '1,5,10' or a mix of both into a sorted list of ints."""
+    numbers = set()
+    for part in value.split(','):
+        start, _, end = part.partition('-')
+        numbers.update(range(int(start), int(end or start) + 1))
+    return sorted(numbers)
+
+
+def parse_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def latency_stats(samples):
+    """Throughput and latency percentiles (milliseconds) for one run."""
+    total = sum(samples)
+    if len(samples) > 1:
+        cuts = statistics.quantiles(samples, n=100, method='inclusive')
+        p50, p95 = cuts[49], cuts[94]
+    else:
+        p50 = p95 = samples[0] if samples else 0.0
+    return {
+        'runs': len(samples),
+        'ops_per_sec': round(len(samples) / total, 1) if total else 0.0,
+        'mean_ms': round(statistics.fmean(samples) * 1000, 3) if samples else 0.0,
+        'p50_ms': round(p50 * 1000, 3),
+        'p95_ms': round(p95 * 1000, 3),
+    }
+
+
+def capacity_payload(version, error_correction, rng):
+    """Lowercase ASCII (byte mode) that fills a symbol of `version` at `error_correction`."""
+    bits = qrcode.util.BIT_LIMIT_TABLE[ERROR_CORRECTION[error_correction]][version]
+    length_bits = 8 if version < 10 else 16
+    return ''.join(rng.choices(string.ascii_lowercase, k=(bits - 4 - length_bits) // 8))
+
+
+# Scan decoders under test; each takes encoded image bytes and returns the decoded text
+def decode_baseline(buffer, size):
+    # The original view code: a new detector per request and a full-resolution colour decode
+    img = cv2.imdecode(np.asarray(bytearray(buffer), dtype=np.uint8), cv2.IMREAD_COLOR)
+    data, _, _ = cv2.QRCodeDetector().detectAndDecode(img)
+    return data
+
+
+def decode_warm_gray(buffer, size):
+    img = cv2.imdecode(np.frombuffer(buffer, np.uint8), cv2.IMREAD_GRAYSCALE)
+    data, _, _ = get_detector().detectAndDecode(img)
+    return data
+
+
+def decode_scan_service(buffer, size):
+    # What scan_service runs in its workers: reduced-resolution grayscale first
+    return decode_image(buffer, size)['data']
+
+
+DECODERS = {'cv2': decode_baseline, 'cv2_warm_gray': decode_warm_gray, 'scan_service': decode_scan_service}
+
+
+def synthetic_photo(data, long_side, angle, noise, rng):
+    """A QR code on a grey canvas with `long_side` pixels, rotated by `angle` degrees, with Gaussian noise, as JPEG."""
+    code = cv2.imdecode(np.frombuffer(render_qr(data, box_size=1, border=4), np.uint8), cv2.IMREAD_GRAYSCALE)
+    height, width = long_side * 3 // 4, long_side
+    side = min(height, width) // 2  # The code covers about a quarter of the frame, like a handheld photo
+    code = cv2.resize(code, (side, side), interpolation=cv2.INTER_NEAREST)
+    canvas = np.full((height, width), 190, np.uint8)
+    top, left = (height - side) // 2, (width - side) // 2
+    canvas[top:top + side, left:left + side] = code
+    if angle:
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        canvas = cv2.warpAffine(canvas, matrix, (width, height), borderValue=190)
+    if noise:
+        canvas = np.clip(canvas + rng.normal(0, noise, canvas.shape), 0, 255).astype(np.uint8)
+    return cv2.imencode('.jpg', canvas, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes(), (width, height)
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks QR generation and scanning on synthetic inputs and emits JSON results.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sections', default='generate,scan', help='generate, scan or both.')
+        parser.add_argument('--versions', default='1-40', help="Symbol versions, e.g. '1-40' or '1,10,40'.")
+        parser.add_argument('--ecc', default='L,M,Q,H', help='Error correction levels.')
+        parser.add_argument('--box-sizes', default='4,10', help='Pixels per module.')
+        parser.add_argument('--formats', default='png,svg', help='Output formats.')
+        parser.add_argument('--renderers', default='pil,native', help='Renderers to compare (see qr_render.py).')
+        parser.add_argument('--repeat', type=int, default=20, help='Renders per generation configuration.')
+        parser.add_argument('--scan-sizes', default='640,1280,2560,4000', help='Long side of synthetic photos in pixels.')
+        parser.add_argument('--rotations', default='0,15,45', help='Rotation of the code in degrees.')
+        parser.add_argument('--noise', default='0,12', help='Gaussian noise sigma (0-255 scale).')
+        parser.add_argument('--decoders', default=','.join(DECODERS), help='Decoders to compare.')
+        parser.add_argument('--scan-repeat', type=int, default=10, help='Decodes per scan configuration.')
+        parser.add_argument('--seed', type=int, default=1234, help='Seed for payloads and noise.')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        """
+        Entry point for the Django management command.
+        Inputs are generated from --seed, so reports from different releases are comparable.
+        """
+        sections = parse_list(options['sections'])
+        if set(sections) - {'generate', 'scan'}:
+            raise CommandError('--sections accepts generate and scan')
+        decoders = parse_list(options['decoders'])
+        if set(decoders) - set(DECODERS):
+            raise CommandError(f"--decoders accepts {', '.join(DECODERS)}")
+        ecc_levels = [level.upper() for level in parse_list(options['ecc'])]
+        if set(ecc_levels) - set(ERROR_CORRECTION):
+            raise CommandError('--ecc accepts L, M, Q and H')
+
+        report = {
+            'meta': {
+                'started_at': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'opencv': cv2.__version__,
+                'numpy': np.__version__,
+                'machine': platform.machine(),
+                'seed': options['seed'],
+            },
+            'generate': [],
+            'scan': [],
+        }
+        if 'generate' in sections:
+            self.bench_generate(report['generate'], options, ecc_levels)
+        if 'scan' in sections:
+            self.bench_scan(report['scan'], options, decoders)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+        else:
+            self.stdout.write(output)
+
+    def bench_generate(self, results, options, ecc_levels):
+        rng = random.Random(options['seed'])
+        for version in parse_ints(options['versions']):
+            for level in ecc_levels:
+                data = capacity_payload(version, level, rng)
+                for box_size in parse_ints(options['box_sizes']):
+                    for fmt in parse_list(options['formats']):
+                        for renderer in parse_list(options['renderers']):
+                            samples = []
+                            for _ in range(options['repeat']):
+                                started = time.perf_counter()
+                                body = render_qr(data, version, level, box_size, 4, fmt, renderer)
+                                samples.append(time.perf_counter() - started)
+                            result = latency_stats(samples)
+                            result.update(
+                                version=version, error_correction=level, box_size=box_size, format=fmt,
+                                renderer=renderer, payload_bytes=len(data), output_bytes=len(body),
+                            )
+                            results.append(result)
+                            self.stderr.write(
+                                f"gen v{version:<2} {level} box={box_size:<2} {fmt} {renderer:<6} "
+                                f"{result['ops_per_sec']:>9}/s p50={result['p50_ms']}ms"
+                            )
+
+    def bench_scan(self, results, options, decoders):
+        rng = np.random.default_rng(options['seed'])
+        data = 'https://example.com/pallet/0001234567'
+        for long_side in parse_ints(options['scan_sizes']):
+            for angle in parse_ints(options['rotations']):
+                for noise in parse_ints(options['noise']):
+                    photo, size = synthetic_photo(data, long_side, angle, noise, rng)
+                    for name in decoders:
+                        decode = DECODERS[name]
+                        samples, decoded = [], 0
+                        for _ in range(options['scan_repeat']):
+                            started = time.perf_counter()
+                            text = decode(photo, size)
+                            samples.append(time.perf_counter() - started)
+                            decoded += text == data
+                        result = latency_stats(samples)
+                        result.update(
+                            decoder=name, width=size[0], height=size[1], rotation=angle, noise=noise,
+                            image_bytes=len(photo), success_rate=round(decoded / len(samples), 3),
+                        )
+                        results.append(result)
+                        self.stderr.write(
+                            f"scan {size[0]}x{size[1]} rot={angle:<3} noise={noise:<3} {name:<13} "
+                            f"p50={result['p50_ms']}ms ok={result['success_rate']}"
+                        )
+
+
+# Usage:
+# $ python manage.py bench_qr --output bench_qr.json
+# $ python manage.py bench_qr --sections generate --versions 1,10,25,40 --ecc L,H --box-sizes 10 --repeat 50
+# $ python manage.py bench_qr --sections scan --scan-sizes 1280,4000 --rotations 0,30 --noise 0,20 --decoders cv2,scan_service
+```
+
+`bench_qr` measures both halves of the QR feature on inputs it generates itself, so runs are reproducible with `--seed`. The generation section renders a payload that fills each symbol for every combination of version (1–40 by default), error correction level, box size, output format and renderer (`pil` for qrcode+PIL, `native` for `qr_render.py`). For each it reports renders/sec, mean, p50 and p95 latency, and output size.
+
+The scan section builds synthetic handheld photos: a code on a grey canvas at several resolutions, rotated and with Gaussian noise, encoded as JPEG. It times each decoder on every photo and records the success rate. `cv2` reproduces the original view code, which creates a new detector per request and decodes at full resolution in colour. `cv2_warm_gray` uses a shared detector on a grayscale decode. `scan_service` is the reduced-resolution path the scan views use now. New renderers or decoders are added by extending `--renderers` (through `render_qr`) or the `DECODERS` table. The JSON report can be committed next to each release for regression tracking.
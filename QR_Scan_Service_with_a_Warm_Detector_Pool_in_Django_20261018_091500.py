@@ -0,0 +1,452 @@
+Title: QR Scan Service with a Warm Detector Pool in Django
+
+```python
+# Install required packages:
+# pip install django opencv-python numpy pillow
+
+# scan_service.py
+import asyncio
+import io
+import os
+import struct
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+
+import cv2
+import numpy as np
+from django.conf import settings
+from PIL import Image, ImageSequence
+
+
+class ScanBusy(Exception):
+    """Raised when every decode slot stays taken for longer than the queue timeout."""
+
+
+class InvalidImage(ValueError):
+    """Raised when the uploaded bytes cannot be decoded as an image."""
+
+
+class ImageTooLarge(InvalidImage):
+    """Raised when an upload exceeds the byte or pixel limits; checked before any decoding."""
+
+
+# Decode modes from smallest to full resolution, as (downscale factor, imread flag)
+REDUCED_MODES = ((4, cv2.IMREAD_REDUCED_GRAYSCALE_4), (2, cv2.IMREAD_REDUCED_GRAYSCALE_2), (1, cv2.IMREAD_GRAYSCALE))
+
+
+def read_upload(upload, max_bytes=None, hasher=None, chunk_size=256 * 1024):
+    """
+    Read an uploaded file into a single preallocated buffer.
+    The size limit is checked against the declared size before anything is read.
+    If `hasher` (e.g. `hashlib.sha256()`) is given, each chunk is fed to it as it is read.
+    """
+    max_bytes = max_bytes or getattr(settings, 'QR_SCAN_MAX_UPLOAD_BYTES', 10 * 1024 * 1024)
+    if upload.size > max_bytes:
+        raise ImageTooLarge(f'Upload exceeds {max_bytes} bytes')
+    buffer = bytearray(upload.size)
+    view = memoryview(buffer)
+    upload.seek(0)
+    filled = 0
+    while filled < len(buffer):
+        count = upload.file.readinto(view[filled:filled + chunk_size])
+        if not count:
+            break
+        if hasher is not None:
+            hasher.update(view[filled:filled + count])
+        filled += count
+    return view[:filled]
+
+
+def image_dimensions(buffer):
+    """
+    Return (width, height) read from the image header without decoding pixels.
+    Supports PNG, JPEG, GIF, BMP and WebP; raises InvalidImage for anything else.
+    """
+    head = bytes(buffer[:32])
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return struct.unpack('>II', head[16:24])
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return struct.unpack('<HH', head[6:10])
+    if head.startswith(b'BM'):
+        width, height = struct.unpack('<ii', head[18:26])
+        return width, abs(height)
+    if head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+        if head[12:16] == b'VP8X':
+            return 1 + int.from_bytes(head[24:27], 'little'), 1 + int.from_bytes(head[27:30], 'little')
+        if head[12:16] == b'VP8L':
+            bits = int.from_bytes(head[21:25], 'little')
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if head[12:16] == b'VP8 ':
+            width, height = struct.unpack('<HH', head[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+    if head.startswith(b'\xff\xd8'):
+        # Walk the JPEG segments up to the first start-of-frame marker
+        data, i = memoryview(buffer), 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                break
+            marker = data[i + 1]
+            if marker in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+                height, width = struct.unpack('>HH', bytes(data[i + 5:i + 9]))
+                return width, height
+            i += 2 + struct.unpack('>H', bytes(data[i + 2:i + 4]))[0]
+    raise InvalidImage('Unsupported image format; upload PNG, JPEG, GIF, BMP or WebP')
+
+
+def check_image(buffer, max_pixels=None):
+    """Reject images whose header declares more than `max_pixels` pixels. Returns (width, height)."""
+    max_pixels = max_pixels or getattr(settings, 'QR_SCAN_MAX_PIXELS', 40_000_000)
+    width, height = image_dimensions(buffer)
+    if width * height > max_pixels:
+        raise ImageTooLarge(f'Image is {width}x{height}; at most {max_pixels} pixels are accepted')
+    return width, height
+
+
+# One detector per worker process (or per thread when decoding inline), created once and reused
+_local = threading.local()
+
+
+def _init_worker():
+    cv2.setNumThreads(1)  # Each worker decodes one image at a time; let the pool provide the parallelism
+    _local.detector = cv2.QRCodeDetector()
+
+
+def get_detector():
+    detector = getattr(_local, 'detector', None)
+    if detector is None:
+        detector = _local.detector = cv2.QRCodeDetector()
+    return detector
+
+
+def decode_image(buffer, size=None, min_side=480):
+    """
+    Decode the QR code in an encoded image (PNG, JPEG, ...).
+
+    The bytes are wrapped with `np.frombuffer` (no copy) and decoded straight to
+    grayscale, at 1/4 or 1/2 resolution first when the short side (`size` is
+    (width, height) from the header) stays at least `min_side` pixels. Full
+    resolution is decoded only if nothing was decoded. Runs in a pool worker, so
+    it takes and returns only plain, picklable values.
+    Returns {'found': bool, 'data': str, 'points': [[x, y], ...] or None, 'scale': int}.
+    Points are in full-resolution pixel coordinates.
+    """
+    encoded = np.frombuffer(buffer, np.uint8)
+    short_side = min(size) if size else 0
+    img = None
+    for scale, mode in REDUCED_MODES:
+        if scale > 1 and short_side // scale < min_side:
+            continue
+        img = cv2.imdecode(encoded, mode)
+        if img is None:
+            break
+        data, points, _ = get_detector().detectAndDecode(img)
+        # A code can be located but not decoded at reduced resolution; try the next size up
+        if points is not None and data:
+            return {
+                'found': True,
+                'data': data,
+                'points': (points.reshape(-1, 2) * scale).round(1).tolist(),
+                'scale': scale,
+            }
+    if img is None:
+        raise InvalidImage('Uploaded file is not a supported image')
+    return {'found': False, 'data': '', 'points': None, 'scale': 1}
+
+
+def detect_codes(img, scale=1):
+    """Yield (data, corner points in full-resolution pixels) for every decodable QR code in `img`."""
+    ok, texts, points, _ = get_detector().detectAndDecodeMulti(img)
+    if ok:
+        for text, quad in zip(texts, points):
+            if text:  # Detected but undecodable codes come back as empty strings
+                yield text, quad * scale
+
+
+def mjpeg_frames(encoded):
+    """Yield each JPEG of a concatenated MJPEG stream as a zero-copy slice of `encoded`."""
+    markers = np.flatnonzero(encoded[:-3] == 0xFF)
+    # An end-of-image marker directly followed by a start-of-image marker separates two frames
+    ends = markers[(encoded[markers + 1] == 0xD9) & (encoded[markers + 2] == 0xFF) & (encoded[markers + 3] == 0xD8)] + 2
+    start = 0
+    for end in (*ends.tolist(), len(encoded)):
+        yield encoded[start:end]
+        start = end
+
+
+def iter_frames(buffer, size, frame_step=1, max_frames=None, min_side=480):
+    """
+    Lazily yield (frame index, grayscale image, scale) for every `frame_step`-th frame
+    of a GIF or MJPEG upload, stopping after `max_frames` frames.
+    Skipped MJPEG frames are never decoded; GIF frames build on each other, so they are
+    unpacked in order but only every `frame_step`-th is converted and scanned.
+    """
+    if bytes(buffer[:6]) in (b'GIF87a', b'GIF89a'):
+        frames, scale, mode = ImageSequence.Iterator(Image.open(io.BytesIO(buffer))), 1, None
+    else:
+        frames = mjpeg_frames(np.frombuffer(buffer, np.uint8))
+        # Every frame of a clip has the same size, so pick one decode resolution up front
+        scale, mode = next((scale, mode) for scale, mode in REDUCED_MODES if min(size) // scale >= min_side or scale == 1)
+    for index, frame in enumerate(frames):
+        if max_frames is not None and index >= max_frames:
+            break
+        if index % frame_step:
+            continue
+        img = np.asarray(frame.convert('L')) if mode is None else cv2.imdecode(frame, mode)
+        if img is None:
+            raise InvalidImage(f'Frame {index} is not a valid image')
+        yield index, img, scale
+
+
+def _code_entry(data, quad, frame):
+    x0, y0 = quad.min(axis=0)
+    x1, y1 = quad.max(axis=0)
+    return {
+        'data': data,
+        'points': quad.round(1).tolist(),
+        'box': [round(float(x0), 1), round(float(y0), 1), round(float(x1 - x0), 1), round(float(y1 - y0), 1)],
+        'frame': frame,
+    }
+
+
+def decode_all(buffer, size, max_codes=None, frame_step=1, max_frames=None, min_side=480):
+    """
+    Find every distinct QR code in a still image, GIF or MJPEG clip.
+
+    Still images are scanned from the smallest reduced resolution up to full
+    resolution, merging what each finds: large codes decode at 1/4 scale, small ones
+    only at full scale. Multi-frame uploads (GIF, or a JPEG followed by more JPEG
+    frames) are scanned frame by frame. Either way the scan stops as soon as
+    `max_codes` distinct codes are found.
+    Returns {'found': bool, 'codes': [{'data', 'points', 'box': [x, y, w, h], 'frame'}], 'frames_scanned': int}.
+    """
+    codes = {}  # data -> entry, first sighting wins
+    frames_scanned = 0
+    encoded = np.frombuffer(buffer, np.uint8)
+    if bytes(buffer[:6]) in (b'GIF87a', b'GIF89a'):
+        multi_frame = True
+    else:
+        # Only a JPEG can start an MJPEG clip; other formats may contain the frame marker bytes by chance
+        multi_frame = bytes(buffer[:2]) == b'\xff\xd8' and next(mjpeg_frames(encoded)).size < encoded.size
+
+    if multi_frame:
+        for index, img, scale in iter_frames(buffer, size, frame_step, max_frames, min_side):
+            frames_scanned += 1
+            for data, quad in detect_codes(img, scale):
+                codes.setdefault(data, _code_entry(data, quad, index))
+            if max_codes and len(codes) >= max_codes:
+                break
+    else:
+        for scale, mode in REDUCED_MODES:
+            if scale > 1 and min(size) // scale < min_side:
+                continue
+            img = cv2.imdecode(encoded, mode)
+            if img is None:
+                raise InvalidImage('Uploaded file is not a supported image')
+            frames_scanned = 1
+            for data, quad in detect_codes(img, scale):
+                codes.setdefault(data, _code_entry(data, quad, 0))
+            if max_codes and len(codes) >= max_codes:
+                break
+
+    found = list(codes.values())[:max_codes] if max_codes else list(codes.values())
+    return {'found': bool(found), 'codes': found, 'frames_scanned': frames_scanned}
+
+
+class QRScanService:
+    """
+    Decodes QR images off the request thread, in a pool of warm worker processes.
+
+    Each worker builds its `cv2.QRCodeDetector` once at startup. At most
+    `max_concurrent` decodes are queued or running per process (per event loop
+    for `ascan`). A caller that cannot get a slot within `queue_timeout` seconds
+    gets `ScanBusy` instead of tying up a web worker. `workers=0` decodes inline
+    in the calling thread, which is handy for tests and development.
+    """
+
+    def __init__(self, workers=None, max_concurrent=None, queue_timeout=None, timeout=None):
+        self.workers = workers if workers is not None else getattr(settings, 'QR_SCAN_WORKERS', os.cpu_count() or 1)
+        self.max_concurrent = max_concurrent or getattr(settings, 'QR_SCAN_MAX_CONCURRENT', 2 * max(self.workers, 1))
+        self.queue_timeout = queue_timeout if queue_timeout is not None else getattr(settings, 'QR_SCAN_QUEUE_TIMEOUT', 2)
+        self.timeout = timeout or getattr(settings, 'QR_SCAN_TIMEOUT', 10)
+        self.min_side = getattr(settings, 'QR_SCAN_MIN_SIDE', 480)
+        self.max_frames = getattr(settings, 'QR_SCAN_MAX_FRAMES', 300)
+        self._pool = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._async_slots = weakref.WeakKeyDictionary()  # event loop -> Semaphore
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self._pool
+
+    def scan(self, buffer):
+        """
+        Decode `buffer` (encoded image bytes), blocking until done.
+        Raises ScanBusy, ImageTooLarge (checked from the header, before decoding) or InvalidImage.
+        """
+        size = check_image(buffer)
+        return self.run(decode_image, self._payload(buffer), size, self.min_side)
+
+    async def ascan(self, buffer):
+        """Same as `scan` for async views; waits without blocking the event loop."""
+        size = check_image(buffer)
+        return await self.arun(decode_image, self._payload(buffer), size, self.min_side)
+
+    def scan_all(self, buffer, max_codes=None, frame_step=1):
+        """
+        Find every QR code in an image, GIF or MJPEG clip (see `decode_all`).
+        Scanning stops early once `max_codes` distinct codes are found.
+        """
+        size = check_image(buffer)
+        return self.run(
+            decode_all, self._payload(buffer), size, max_codes, frame_step, self.max_frames, self.min_side
+        )
+
+    async def ascan_all(self, buffer, max_codes=None, frame_step=1):
+        size = check_image(buffer)
+        return await self.arun(
+            decode_all, self._payload(buffer), size, max_codes, frame_step, self.max_frames, self.min_side
+        )
+
+    def _payload(self, buffer):
+        # Inline decoding reads the caller's buffer in place; worker processes need picklable bytes
+        return buffer if not self.workers else bytes(buffer)
+
+    def run(self, func, *args):
+        """
+        Run a picklable decode function under the concurrency cap.
+        A decode that times out keeps its slot until the worker actually finishes it,
+        so stuck decodes cannot pile up in the pool behind the cap.
+        """
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise ScanBusy('All QR decode slots are busy')
+        if not self.workers:
+            try:
+                return func(*args)
+            finally:
+                self._slots.release()
+        try:
+            future = self.pool.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise ScanBusy('QR decode timed out')
+
+    async def arun(self, func, *args):
+        loop = asyncio.get_running_loop()
+        slots = self._async_slots.get(loop)
+        if slots is None:
+            slots = self._async_slots[loop] = asyncio.Semaphore(self.max_concurrent)
+        try:
+            await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise ScanBusy('All QR decode slots are busy')
+        if not self.workers:
+            try:
+                return await asyncio.to_thread(func, *args)
+            finally:
+                slots.release()
+        try:
+            future = self.pool.submit(func, *args)
+        except BaseException:
+            slots.release()
+            raise
+
+        def release(_):
+            # Called from the pool's thread; the semaphore belongs to the event loop
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(slots.release)
+
+        future.add_done_callback(release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise ScanBusy('QR decode timed out')
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+# Shared by every scanning view in the process
+scan_service = QRScanService()
+
+
+# settings.py
+# QR_SCAN_WORKERS = 4  # Decoder processes per web worker; 0 decodes in the request thread
+# QR_SCAN_MAX_CONCURRENT = 8  # Decodes queued or running at once; more callers wait, then get ScanBusy
+# QR_SCAN_QUEUE_TIMEOUT = 2  # Seconds to wait for a free slot
+# QR_SCAN_TIMEOUT = 10  # Seconds allowed for one decode
+# QR_SCAN_MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+# QR_SCAN_MAX_PIXELS = 40_000_000  # Checked from the image header before decoding
+# QR_SCAN_MIN_SIDE = 480  # Smallest short side (pixels) a reduced-resolution decode may use
+# QR_SCAN_MAX_FRAMES = 300  # Frames read from a GIF or MJPEG clip before giving up
+```
+
+```python
+# tests.py
+import asyncio
+import time
+
+from django.test import SimpleTestCase
+
+from .scan_service import QRScanService, ScanBusy
+
+
+def slow_decode(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+class QRScanServiceTests(SimpleTestCase):
+    """
+    Unit tests for the decode slot accounting of the scan service.
+    """
+
+    def setUp(self):
+        self.service = QRScanService(workers=1, max_concurrent=1, queue_timeout=0.1, timeout=0.2)
+
+    def tearDown(self):
+        self.service.close()
+
+    def test_timed_out_decode_keeps_its_slot_until_it_finishes(self):
+        self.service.run(slow_decode, 0)  # Start the worker process outside the timed calls
+        with self.assertRaisesMessage(ScanBusy, 'timed out'):
+            self.service.run(slow_decode, 1)
+        with self.assertRaisesMessage(ScanBusy, 'busy'):
+            self.service.run(slow_decode, 0)
+
+        time.sleep(1)
+        self.assertEqual(self.service.run(slow_decode, 0), 0)
+
+    def test_async_timed_out_decode_keeps_its_slot_until_it_finishes(self):
+        async def scenario():
+            await self.service.arun(slow_decode, 0)
+            with self.assertRaisesMessage(ScanBusy, 'timed out'):
+                await self.service.arun(slow_decode, 1)
+            with self.assertRaisesMessage(ScanBusy, 'busy'):
+                await self.service.arun(slow_decode, 0)
+
+            await asyncio.sleep(1)
+            self.assertEqual(await self.service.arun(slow_decode, 0), 0)
+
+        asyncio.run(scenario())
+```
+
+`scan_service.py` moves QR decoding off the request thread. `QRScanService` keeps a `ProcessPoolExecutor` whose workers each create one `cv2.QRCodeDetector` at startup (with OpenCV threading turned off) and reuse it for every image. A bounded semaphore caps how many decodes can be queued or running at once. When the cap is reached, callers wait up to `QR_SCAN_QUEUE_TIMEOUT` seconds and then get `ScanBusy`, which the views turn into a `503`. A slow photo therefore never holds more than one decoder process, and a burst of uploads cannot pile up behind it. A decode that times out keeps its slot until the worker finishes it, because a process pool cannot interrupt a running task. Stuck decodes therefore count against the cap instead of quietly filling the pool. `scan()` is the blocking API for regular views. `ascan()` awaits the same pool from async views without blocking the event loop.
+
+Uploads are read once into a preallocated buffer by `read_upload`, which enforces `QR_SCAN_MAX_UPLOAD_BYTES`. `check_image` reads the width and height from the PNG, JPEG, GIF, BMP or WebP header and rejects images over `QR_SCAN_MAX_PIXELS` before any pixels are decoded. `decode_image` wraps the bytes with `np.frombuffer` and decodes straight to grayscale. Large images are decoded at 1/4 or 1/2 resolution first (`IMREAD_REDUCED_GRAYSCALE_4/2`), and full resolution is decoded only when nothing is detected. Reported corner points are always in full-resolution coordinates.
+
+`scan_all()` finds several codes at once with `detectAndDecodeMulti`. It also accepts animated GIFs and MJPEG clips: `iter_frames` walks them lazily, scans every `frame_step`-th frame (skipped MJPEG frames are never decoded), and stops as soon as `max_codes` distinct codes are found or `QR_SCAN_MAX_FRAMES` frames have been read. An upload is treated as MJPEG only when it starts with a JPEG start-of-image marker. A still image is scanned at every resolution from 1/4 up to full and the results are merged, because small codes only decode at full resolution. With `max_codes` the scan stops at the first resolution that reaches it. Each code is reported once, with its corner points, an `[x, y, w, h]` bounding box and the frame where it was first seen.
+
+`scan_uploaded_qr` and `scan_qr_code` in the QR scanning modules now go through `read_upload` and `scan_service`, and `scan_qr_code_async` is the async version of the upload view. Oversized uploads get `413`.
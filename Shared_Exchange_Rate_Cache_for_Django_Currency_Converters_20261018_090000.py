@@ -0,0 +1,215 @@
+Title: Shared Exchange Rate Cache for Django Currency Converters
+
+```python
+# Install required packages:
+# pip install requests numpy httpx
+
+# rates.py
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import RateSnapshot
+from .upstream import upstream
+
+DEFAULT_RATES_API_URL = 'https://api.exchangerate-api.com/v4/latest/{base}'
+
+
+class RateTable:
+    """
+    Immutable cross-rate matrix derived from a single base-currency rate table.
+
+    `matrix[index[a], index[b]]` is the number of units of `b` bought by one unit
+    of `a`, so any pair is answered by one array lookup.
+    """
+
+    def __init__(self, base, codes, base_rates, fetched_at, version=0):
+        self.base = base
+        self.fetched_at = fetched_at
+        self.version = version
+        self.codes = tuple(codes)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        base_rates = np.asarray(base_rates, dtype=np.float64)
+        self.matrix = base_rates[np.newaxis, :] / base_rates[:, np.newaxis]
+        self.matrix.setflags(write=False)
+        self._rows = {}
+
+    @classmethod
+    def from_rates(cls, base, rates, fetched_at, version=0):
+        """Build a table from a {currency: rate} dict as returned by the upstream API."""
+        rates = dict(rates)
+        rates.setdefault(base, 1.0)
+        codes = sorted(rates)
+        return cls(base, codes, [rates[code] for code in codes], fetched_at, version)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Build a table from a persisted `RateSnapshot` without parsing any JSON."""
+        return cls(
+            snapshot.base,
+            snapshot.codes.split(','),
+            np.frombuffer(snapshot.rates, dtype='<f8'),
+            snapshot.fetched_at.timestamp(),
+            snapshot.version,
+        )
+
+    def __contains__(self, code):
+        return code.upper() in self.index
+
+    def rate(self, from_currency, to_currency):
+        """Return the rate for one pair. Raises KeyError naming an unknown currency code."""
+        from_currency, to_currency = from_currency.upper(), to_currency.upper()
+        if from_currency not in self.index:
+            raise KeyError(from_currency)
+        if to_currency not in self.index:
+            raise KeyError(to_currency)
+        return float(self.matrix[self.index[from_currency], self.index[to_currency]])
+
+    def convert_many(self, amounts, from_codes, to_codes):
+        """
+        Convert many amounts in one vectorized pass over the matrix.
+
+        Codes must already be upper-case. Returns `(converted, rates, valid)` arrays;
+        `valid[i]` is False when either currency of item `i` is unknown, and the
+        corresponding `converted`/`rates` entries are NaN.
+        """
+        count = len(amounts)
+        index = self.index
+        src = np.fromiter((index.get(code, -1) for code in from_codes), dtype=np.intp, count=count)
+        dst = np.fromiter((index.get(code, -1) for code in to_codes), dtype=np.intp, count=count)
+        valid = (src >= 0) & (dst >= 0)
+        rates = self.matrix[src, dst]  # Unknown codes index -1 here and are masked below
+        rates[~valid] = np.nan
+        converted = np.asarray(amounts, dtype=np.float64) * rates
+        return converted, rates, valid
+
+    def rates_for(self, base):
+        """Return the {currency: rate} table for `base` as a plain dict."""
+        base = base.upper()
+        rates = self._rows.get(base)
+        if rates is None:
+            row = self.matrix[self.index[base]]
+            rates = self._rows[base] = dict(zip(self.codes, row.tolist()))
+        return rates
+
+
+class RatesUnavailable(Exception):
+    """Raised when no rate snapshot has been persisted yet."""
+
+
+class RateProvider:
+    """
+    Serves exchange rates from an in-memory `RateTable` built from the latest snapshot.
+
+    Requests never call the upstream API: they read process memory and, once per
+    TTL, check the latest `RateSnapshot` version with a one-column query. A newer
+    snapshot is read from the Django cache, or from the row itself. Only
+    `refresh()`, run by the `refresh_rates` command, fetches from upstream.
+    """
+
+    def __init__(self, ttl=None, base=None, api_url=None, timeout=5):
+        self.ttl = ttl if ttl is not None else getattr(settings, 'CURRENCY_RATES_TTL', 60)
+        self.base = (base or getattr(settings, 'CURRENCY_RATES_BASE', 'USD')).upper()
+        self.api_url = api_url or getattr(settings, 'CURRENCY_RATES_API_URL', DEFAULT_RATES_API_URL)
+        self.api_key = getattr(settings, 'CURRENCY_RATES_API_KEY', None)
+        self.timeout = timeout
+        self._table = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_table(self):
+        """Return the current `RateTable`, re-reading the latest snapshot at most once per TTL."""
+        table = self._table
+        if table is not None and self._checked_at + self.ttl > time.monotonic():
+            return table
+
+        with self._lock:
+            # Another thread may have reloaded the table while we waited
+            if self._table is None or self._checked_at + self.ttl <= time.monotonic():
+                self._swap(self._load())
+            return self._table
+
+    def get_rates(self, base='USD'):
+        """Return the {currency: rate} table for `base`."""
+        return self.get_table().rates_for(base)
+
+    def get_rate(self, from_currency, to_currency):
+        """Return the rate for one currency pair. Raises KeyError for unknown codes."""
+        return self.get_table().rate(from_currency, to_currency)
+
+    def invalidate(self):
+        """Drop the cached table from this process."""
+        self._table = None
+
+    def install(self, table):
+        """Serve `table` from this process until the next reload (used by benchmarks and tests)."""
+        with self._lock:
+            self._table = table
+            self._checked_at = time.monotonic()
+
+    def refresh(self):
+        """Fetch the base table upstream, persist it as the latest snapshot and publish it."""
+        snapshot = RateSnapshot.store(self.base, self.fetch(self.base))
+        cache.set(self._cache_key(), snapshot, timeout=self.ttl)
+        table = RateTable.from_snapshot(snapshot)
+        with self._lock:
+            self._swap(table)
+        return table
+
+    def _swap(self, table):
+        # Readers see either the old or the new table, never a partial one
+        if self._table is None or table.version >= self._table.version:
+            self._table = table
+        self._checked_at = time.monotonic()
+
+    def _cache_key(self):
+        return f'currency:rates:{self.base}'
+
+    def _load(self):
+        # The snapshot row decides which version is current, so a per-process cache
+        # (e.g. LocMemCache) cannot pin a worker to the table it loaded first
+        version = RateSnapshot.objects.filter(base=self.base).values_list('version', flat=True).first()
+        if version is None:
+            raise RatesUnavailable(f'No rate snapshot for {self.base}; run "manage.py refresh_rates"')
+
+        table = self._table
+        if table is not None and table.version == version:
+            return table  # Unchanged since the last check; keep the built matrix
+
+        snapshot = cache.get(self._cache_key())
+        if snapshot is None or snapshot.version != version:
+            snapshot = RateSnapshot.objects.get(base=self.base)
+            snapshot.rates = bytes(snapshot.rates)  # Some backends return a memoryview, which cannot be cached
+            cache.set(self._cache_key(), snapshot, timeout=self.ttl)
+        return RateTable.from_snapshot(snapshot)
+
+    def fetch(self, base):
+        """Fetch a fresh rate table for `base` from the upstream API over the shared connection pool."""
+        params = {'api_key': self.api_key} if self.api_key else None
+        response = upstream.get(self.api_url.format(base=base), params=params, timeout=self.timeout)
+        response.raise_for_status()  # Raise an exception for HTTP errors
+        return response.json()['rates']
+
+
+# Shared by every view in the process
+rate_provider = RateProvider()
+
+
+# settings.py
+# CURRENCY_RATES_TTL = 60  # Seconds between checks for a newer snapshot
+# CURRENCY_RATES_BASE = 'USD'  # The only table fetched upstream
+# CURRENCY_RATES_API_KEY = 'your_api_key'
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#         'LOCATION': 'redis://127.0.0.1:6379',
+#     }
+# }
+```
+
+The `RateProvider` serves a single base-currency table (USD by default) as a `RateTable`. A `RateTable` is a NumPy cross-rate matrix plus a currency-code to index map, so every currency pair is answered by one array lookup. A reload builds a new table and swaps the reference in one step, so concurrent readers never see a half-built matrix.
+
+Rates are fetched only by `RateProvider.refresh()`, which the `refresh_rates` management command runs on a schedule. It stores each fetch as a `RateSnapshot` and publishes it to the Django cache. Views read process memory, so no request ever waits on the upstream API. Every `CURRENCY_RATES_TTL` seconds a worker checks the version of the latest snapshot row with a one-column query. Only when it has changed does the worker load the new snapshot, from the Django cache if it is there, otherwise from the row. A cold worker warms from the last persisted snapshot. Every worker picks up a refresh within one TTL, whatever the cache backend, including the per-process `LocMemCache`. A shared backend such as Redis or Memcached saves each worker from reading the snapshot row itself.
@@ -3,6 +3,7 @@ Title: Weather API Scraper Using Django
 ```python
 import requests
 from django.core.management.base import BaseCommand
+from myapp.upstream import upstream
 
 class Command(BaseCommand):
     help = 'Scrapers weather information from an external API.'
@@ -27,8 +28,8 @@ class Command(BaseCommand):
                 'units': 'metric'  # Use metric system for temperature
             }
 
-            # Make an API GET request to fetch weather data
-            response = requests.get(api_url, params=params)
+            # Make an API GET request to fetch weather data (pooled connection with a timeout)
+            response = upstream.get(api_url, params=params)
             
             # Raise an exception for HTTP errors
             response.raise_for_status()
@@ -21,7 +21,7 @@ from django.shortcuts import render
 from django.http import JsonResponse
 from .models import Weather
 from django.views.decorators.csrf import csrf_exempt
-import requests
+from .upstream import upstream
 
 # Replace 'your_api_key' with an actual API key from a weather service provider
 API_KEY = 'your_api_key'
@@ -29,7 +29,7 @@ BASE_URL = 'http://api.openweathermap.org/data/2.5/weather?q={city}&appid={key}&
 
 def fetch_weather_data(city):
     try:
-        response = requests.get(BASE_URL.format(city=city, key=API_KEY))
+        response = upstream.get(BASE_URL.format(city=city, key=API_KEY))
         data = response.json()
         if response.status_code == 200:
             temperature = data['main']['temp']
@@ -14,6 +14,13 @@ class WeatherAPIView(View):
         weather_data = WeatherAPIService.fetch_weather(city) # Use service to fetch weather data
         return JsonResponse(weather_data)
 
+class AsyncWeatherAPIView(View):
+    async def get(self, request, *args, **kwargs):
+        """Async GET handler for ASGI deployments; the worker is free while the API responds"""
+        city = request.GET.get('city', 'San Francisco')
+        weather_data = await WeatherAPIService.afetch_weather(city)
+        return JsonResponse(weather_data)
+
 # models.py
 from django.db import models
 
@@ -27,18 +34,21 @@ class WeatherData(models.Model):
         return f'{self.city}: {self.temperature}°C, {self.condition}'
 
 # services.py
+import httpx
 import requests
+from .models import WeatherData
+from .upstream import upstream
 
 class WeatherAPIService:
+    # Example URL. Replace with actual weather API endpoint and key.
+    API_URL = 'https://api.example.com/weather'
+    API_KEY = 'your_api_key'
+
     @staticmethod
     def fetch_weather(city):
         """Fetches weather data from an external weather API"""
-        # Example URL. Replace with actual weather API endpoint and key.
-        api_key = 'your_api_key'
-        url = f'https://api.example.com/weather?city={city}&apikey={api_key}'
-        
         try:
-            response = requests.get(url)
+            response = upstream.get(WeatherAPIService.API_URL, params={'city': city, 'apikey': WeatherAPIService.API_KEY})
             response.raise_for_status() # Raise HTTPError for bad responses
             data = response.json() # Convert response to JSON
             
@@ -61,12 +71,38 @@ class WeatherAPIService:
             # Handle requests exceptions
             return {'error': str(e)}
 
+    @staticmethod
+    async def afetch_weather(city):
+        """Async variant of fetch_weather for ASGI views"""
+        try:
+            response = await upstream.aget(WeatherAPIService.API_URL, params={'city': city, 'apikey': WeatherAPIService.API_KEY})
+            response.raise_for_status() # Raise HTTPStatusError for bad responses
+            data = response.json()
+
+            temperature = data['main']['temp']
+            condition = data['weather'][0]['description']
+
+            await WeatherData.objects.aupdate_or_create(
+                city=city,
+                defaults={'temperature': temperature, 'condition': condition}
+            )
+
+            return {
+                'city': city,
+                'temperature': temperature,
+                'condition': condition
+            }
+        except httpx.HTTPError as e:
+            # Handle httpx exceptions
+            return {'error': str(e)}
+
 # urls.py
 from django.urls import path
-from .views import WeatherAPIView
+from .views import WeatherAPIView, AsyncWeatherAPIView
 
 urlpatterns = [
     path('api/weather/', WeatherAPIView.as_view(), name='weather_api'),
+    path('api/weather/async/', AsyncWeatherAPIView.as_view(), name='weather_api_async'),
 ]
 
 # Run migrations to create WeatherData model in the database
@@ -74,4 +110,4 @@ urlpatterns = [
 # $ python manage.py migrate
 ```
 
-This code snippet demonstrates a basic weather API scraper using Django, adhering to the MVC pattern. The `views.py` handles requests and responses, the `models.py` defines the data structure, and the `services.py` performs the business logic of fetching weather data from an external API. This separation of concerns offers a clean and scalable approach.
\ No newline at end of file
+This code snippet demonstrates a basic weather API scraper using Django, adhering to the MVC pattern. The `views.py` handles requests and responses, the `models.py` defines the data structure, and the `services.py` performs the business logic of fetching weather data from an external API through the shared pooled `upstream` client, with an async variant for ASGI deployments. This separation of concerns offers a clean and scalable approach.
\ No newline at end of file
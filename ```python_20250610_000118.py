@@ -2,16 +2,15 @@
 # Title: Simple File Compression Tool in Django
 
 import os
-import gzip
-import shutil
 from django.http import HttpResponse
 from django.views import View
 from django.conf import settings
+from .compression_codecs import codec_options, compress_path
 
 class FileCompressionView(View):
     """
-    A Django view for compressing files using gzip.
-    Optimized for performance by reading and writing large blocks.
+    A Django view for compressing files using gzip or another registered codec.
+    Optimized for performance by compressing blocks of the file in parallel (see pgzip.py).
     """
 
     def get(self, request, *args, **kwargs):
@@ -24,33 +23,37 @@ class FileCompressionView(View):
         # Ensure the file exists
         if not os.path.exists(file_path):
             return HttpResponse("File does not exist.", status=404)
+
+        # Optional ?codec= (gzip, bz2, lzma, ... or auto) and ?level=
+        try:
+            options = codec_options(request.GET)
+        except ValueError as e:
+            return HttpResponse(f"Invalid compression options: {e}", status=400)
         
         # Compress the file
-        compressed_file_path = self.compress_file(file_path)
+        compressed_file_path = self.compress_file(file_path, options['codec'], options['level'])
         
+        if compressed_file_path == file_path:
+            return HttpResponse("File is already compressed; left as-is.", status=200)
+
         # Return the path to the compressed file
         return HttpResponse(f"Compressed file created at: {compressed_file_path}", status=200)
     
-    def compress_file(self, file_path):
+    def compress_file(self, file_path, codec=None, level=None):
         """
-        Compresses the specified file using gzip.
+        Compresses the specified file with the given codec.
 
         Args:
             file_path (str): The path to the file to compress.
+            codec (str): A codec from compression_codecs.CODECS, 'auto', or None for COMPRESSION_CODEC.
+            level (int): Compression level, or None for the codec default.
 
         Returns:
-            str: The path to the compressed file.
+            str: The path to the compressed file, or file_path itself when the
+                content would not compress and was left as-is.
         """
-        compressed_file_path = f"{file_path}.gz"
-
-        # Use a large block size for reading/writing for better performance
-        block_size = 128 * 1024  # 128 KB
-
-        with open(file_path, 'rb') as original_file:
-            with gzip.open(compressed_file_path, 'wb') as compressed_file:
-                shutil.copyfileobj(original_file, compressed_file, length=block_size)
-
-        return compressed_file_path
+        # gzip blocks are deflated on PGZIP_WORKERS threads; the result is an ordinary gzip file
+        return compress_path(file_path, codec, level)['path']
 
 # Example configuration for the Django URL dispatcher to add the file compression route
 from django.urls import path
@@ -60,4 +63,4 @@ urlpatterns = [
 ]
 ```
 
-This code snippet defines a simple Django view that can compress files using the gzip format. It includes basic error handling and uses a larger block size during file operations to enhance performance. The file paths should be managed with care to handle sensitive data appropriately in production environments.
\ No newline at end of file
+This code snippet defines a simple Django view that can compress files using the gzip format, or any codec in `compression_codecs.py` chosen with `?codec=` and `?level=` (`?codec=auto` picks one by trial compression of a sample). Files that are already compressed, such as JPEGs or ZIPs, are detected from a sample and left as they are. It includes basic error handling and compresses large files on all CPU cores with `pgzip.gzip_file`, which produces a standard gzip file. The file paths should be managed with care to handle sensitive data appropriately in production environments.
\ No newline at end of file